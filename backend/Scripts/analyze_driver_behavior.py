@@ -30,6 +30,9 @@ Usage Examples:
     python analyze_driver_behavior.py --step features
     python analyze_driver_behavior.py --step analyze
     python analyze_driver_behavior.py --step visualize
+    
+    # Run complete pipeline with independent steps in parallel
+    python analyze_driver_behavior.py --parallel
 
 Author: Driver Behavior Analysis System
 Version: 1.0
@@ -41,19 +44,72 @@ import os           # For operating system interface
 from pathlib import Path  # For cross-platform path handling
 import argparse     # For command-line argument parsing
 import warnings     # For suppressing non-critical warnings
+import functools    # For caching the data path lookup
+from concurrent.futures import ProcessPoolExecutor  # For running independent steps concurrently
+
+from joblib import Memory, parallel_backend  # For result caching and multi-core training
 
 # Add src directory to Python path for module imports
+# Pipeline components are imported inside each step so that running a single
+# step only pays for the pandas/sklearn/matplotlib imports it actually needs
 sys.path.append(str(Path(__file__).parent / "src"))
 
-# Import analysis pipeline components
-from scripts.data_preprocessing import DriverBehaviorDataProcessor
-from scripts.feature_engineering import WindowFeatureEngineer, process_existing_features
-from scripts.driver_behavior_analysis import DriverBehaviorAnalyzer
-from scripts.visualization import DriverBehaviorVisualizer
-
 # Suppress warnings for cleaner output during analysis
 warnings.filterwarnings('ignore')
 
+# Column types of the raw sensor CSV, so pandas skips type inference and
+# keeps readings in float32 instead of the default float64
+RAW_SENSOR_DTYPES = {
+    'AccX': 'float32', 'AccY': 'float32', 'AccZ': 'float32',
+    'GyroX': 'float32', 'GyroY': 'float32', 'GyroZ': 'float32',
+    'Target': 'int8',
+}
+
+# Data sources for analysis and visualization, in order of preference
+DATA_PATHS = (
+    "datasets/silver/processed_driver_behavior_data.csv",
+    "src/datasets/bronze/Driving Behavior Dataset/sensor_raw.csv"
+)
+
+# On-disk cache for preprocessing results, keyed on the raw file, its mtime and
+# the preprocessor source's mtime; kept in backend/cache whatever the cwd
+CACHE_DIR = Path(__file__).resolve().parent.parent / "cache"
+memory = Memory(str(CACHE_DIR), verbose=0)
+
+def _processor_mtime():
+    """
+    Modification time of scripts/data_preprocessing.py, or 0 if it can't be found.
+
+    joblib only hashes the code of the cached function itself, so the
+    imported preprocessor has to be part of the key for edits to it to
+    invalidate the cache.
+    """
+    import importlib.util
+    try:
+        spec = importlib.util.find_spec("scripts.data_preprocessing")
+    except ImportError:
+        return 0
+    if spec is None or not spec.origin:
+        return 0
+    return os.path.getmtime(spec.origin)
+
+@memory.cache
+def _process_raw_data(raw_data_path, mtime, processor_mtime):
+    """Run preprocessing on the raw CSV; reruns when the file or the preprocessor changes."""
+    from scripts.data_preprocessing import DriverBehaviorDataProcessor
+    
+    processor = DriverBehaviorDataProcessor(raw_data_path)
+    processed_df = processor.process_data()
+    return processor, processed_df
+
+@functools.lru_cache(maxsize=1)
+def _pick_data_path(paths):
+    """Return the first existing path in ``paths`` (cached per process), or None."""
+    for path in paths:
+        if os.path.exists(path):
+            return path
+    return None
+
 def setup_directories():
     """
     Create necessary directory structure for the analysis pipeline.
@@ -105,11 +161,10 @@ def run_data_preprocessing():
     raw_data_path = "src/datasets/bronze/Driving Behavior Dataset/sensor_raw.csv"
     output_path = "datasets/silver/processed_driver_behavior_data.csv"
     
-    # Initialize data processor with raw data path
-    processor = DriverBehaviorDataProcessor(raw_data_path)
-    
-    # Process raw data through cleaning and validation pipeline
-    processed_df = processor.process_data()
+    # Process raw data through cleaning and validation pipeline, reusing the
+    # cached result when neither the raw file nor the preprocessor has changed
+    processor, processed_df = _process_raw_data(raw_data_path, os.path.getmtime(raw_data_path),
+                                                _processor_mtime())
     
     # Save processed data to intermediate storage for next pipeline step
     processor.save_processed_data(output_path)
@@ -122,6 +177,9 @@ def run_feature_engineering():
     print("STEP 2: FEATURE ENGINEERING")
     print("="*60)
     
+    import pandas as pd
+    from scripts.feature_engineering import WindowFeatureEngineer, process_existing_features
+    
     # Process existing pre-computed features
     process_existing_features()
     
@@ -129,8 +187,7 @@ def run_feature_engineering():
     raw_data_path = "src/datasets/bronze/Driving Behavior Dataset/sensor_raw.csv"
     
     # Load raw data
-    import pandas as pd
-    df_raw = pd.read_csv(raw_data_path)
+    df_raw = pd.read_csv(raw_data_path, dtype=RAW_SENSOR_DTYPES)
     
     # Create window-based features
     engineer = WindowFeatureEngineer(window_sizes=[5, 10, 15, 20])
@@ -142,33 +199,35 @@ def run_feature_engineering():
     
     return features_df
 
-def run_analysis():
-    """Run driver behavior analysis."""
+def run_analysis(n_jobs=-1):
+    """
+    Run driver behavior analysis.
+    
+    Args:
+        n_jobs (int): Worker count for scikit-learn training and cross-validation
+                      (-1 uses all cores)
+    """
     print("\n" + "="*60)
     print("STEP 3: DRIVER BEHAVIOR ANALYSIS")
     print("="*60)
     
     # Try to use processed data first, then raw data
-    data_paths = [
-        "datasets/silver/processed_driver_behavior_data.csv",
-        "src/datasets/bronze/Driving Behavior Dataset/sensor_raw.csv"
-    ]
-    
-    data_path = None
-    for path in data_paths:
-        if Path(path).exists():
-            data_path = path
-            break
+    data_path = _pick_data_path(DATA_PATHS)
     
     if data_path is None:
         print("No data found! Please check your data paths.")
         return
     
+    from scripts.driver_behavior_analysis import DriverBehaviorAnalyzer
+    
     analyzer = DriverBehaviorAnalyzer(data_path)
     analyzer.load_data()
     analyzer.prepare_data()
-    analyzer.train_models()
-    analyzer.evaluate_models()
+    
+    # Estimators left at n_jobs=None pick up the worker count from the active backend
+    with parallel_backend("loky", n_jobs=n_jobs):
+        analyzer.train_models()
+        analyzer.evaluate_models()
     analyzer.analyze_driver_behavior()
     
     # Generate visualizations
@@ -193,27 +252,54 @@ def run_visualization():
     print("="*60)
     
     # Try to use processed data first, then raw data
-    data_paths = [
-        "datasets/silver/processed_driver_behavior_data.csv",
-        "src/datasets/bronze/Driving Behavior Dataset/sensor_raw.csv"
-    ]
-    
-    data_path = None
-    for path in data_paths:
-        if Path(path).exists():
-            data_path = path
-            break
+    data_path = _pick_data_path(DATA_PATHS)
     
     if data_path is None:
         print("No data found! Please check your data paths.")
         return
     
+    from scripts.visualization import DriverBehaviorVisualizer
+    
     visualizer = DriverBehaviorVisualizer(data_path)
     visualizer.load_data()
     visualizer.generate_all_visualizations()
     
     return visualizer
 
+def _run_stage(stage, *args):
+    """Run a pipeline step in a worker process, discarding its (unpicklable) result."""
+    stage(*args)
+
+def run_pipeline_parallel(n_jobs=-1):
+    """
+    Run the complete pipeline with independent steps in parallel processes.
+    
+    Feature engineering reads the raw CSV and overlaps with preprocessing.
+    Analysis and visualization both read the preprocessed data, so they start
+    once preprocessing has finished and then run alongside each other. Each
+    step gets its own process because matplotlib state is not thread-safe.
+    
+    Args:
+        n_jobs (int): Worker count forwarded to model training; -1 leaves
+            one core each for the feature engineering and visualization
+            processes running next to it
+    """
+    if n_jobs == -1:
+        n_jobs = max(1, (os.cpu_count() or 1) - 2)
+    
+    # One worker per concurrent step: feature engineering may still be
+    # running when analysis and visualization start
+    with ProcessPoolExecutor(max_workers=3) as executor:
+        features = executor.submit(_run_stage, run_feature_engineering)
+        executor.submit(_run_stage, run_data_preprocessing).result()
+        
+        analysis = executor.submit(_run_stage, run_analysis, n_jobs)
+        visualization = executor.submit(_run_stage, run_visualization)
+        
+        # Re-raise any step failure in the parent process
+        for future in (features, analysis, visualization):
+            future.result()
+
 def main():
     """Main function to run the complete pipeline."""
     parser = argparse.ArgumentParser(description='AI-Based Driver Behavior Analysis System')
@@ -222,6 +308,12 @@ def main():
     parser.add_argument('--data-path', type=str, 
                        default='src/datasets/bronze/Driving Behavior Dataset/sensor_raw.csv',
                        help='Path to the raw data')
+    parser.add_argument('--n-jobs', type=int, default=-1,
+                       help='Parallel workers for model training (-1 = all cores)')
+    parser.add_argument('--parallel', action='store_true',
+                       help='With --step all, run independent steps concurrently')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Clear the cached preprocessing results before running')
     
     args = parser.parse_args()
     
@@ -231,18 +323,24 @@ def main():
     # Setup directories
     setup_directories()
     
+    if args.no_cache:
+        memory.clear(warn=False)
+    
     try:
-        if args.step in ['preprocess', 'all']:
-            run_data_preprocessing()
-        
-        if args.step in ['features', 'all']:
-            run_feature_engineering()
-        
-        if args.step in ['analyze', 'all']:
-            run_analysis()
-        
-        if args.step in ['visualize', 'all']:
-            run_visualization()
+        if args.step == 'all' and args.parallel:
+            run_pipeline_parallel(n_jobs=args.n_jobs)
+        else:
+            if args.step in ['preprocess', 'all']:
+                run_data_preprocessing()
+            
+            if args.step in ['features', 'all']:
+                run_feature_engineering()
+            
+            if args.step in ['analyze', 'all']:
+                run_analysis(n_jobs=args.n_jobs)
+            
+            if args.step in ['visualize', 'all']:
+                run_visualization()
         
         print("\n" + "="*60)
         print("✅ ANALYSIS COMPLETED SUCCESSFULLY!")
@@ -2,46 +2,81 @@ from picamera2 import Picamera2
 import cv2
 import numpy as np
 import time
-from collections import deque
-
-# Store history of lanes for smoothing
-left_history = deque(maxlen=10)
-right_history = deque(maxlen=10)
-
-def average_lane(lines):
-    if len(lines) == 0:
-        return None
-    x1 = int(np.mean([l[0] for l in lines]))
-    y1 = int(np.mean([l[1] for l in lines]))
-    x2 = int(np.mean([l[2] for l in lines]))
-    y2 = int(np.mean([l[3] for l in lines]))
-    return (x1, y1, x2, y2)
+import threading
+
+# Capture size; YUV420 gives the grayscale image for free as the Y plane
+FRAME_WIDTH = 640
+FRAME_HEIGHT = 360
+
+# Ring buffers of recent (x1, y1, x2, y2) lanes for smoothing
+HISTORY_LEN = 10
+left_history = np.zeros((HISTORY_LEN, 4), dtype=np.int32)
+right_history = np.zeros((HISTORY_LEN, 4), dtype=np.int32)
+left_count = 0   # lanes pushed so far; next slot is count % HISTORY_LEN
+right_count = 0
+
+# Run the filter chain on the GPU when OpenCV has CUDA; otherwise use the
+# OpenCL transparent API (UMat) so frames still stay on the GPU between stages
+USE_CUDA = hasattr(cv2, "cuda") and cv2.cuda.getCudaEnabledDeviceCount() > 0
+if USE_CUDA:
+    gpu_frame = cv2.cuda_GpuMat()
+    gpu_blur = cv2.cuda.createGaussianFilter(cv2.CV_8UC1, cv2.CV_8UC1, (5, 5), 0)
+    gpu_canny = cv2.cuda.createCannyEdgeDetector(50, 150)
+else:
+    cv2.ocl.setUseOpenCL(True)
+    # Separable 5-tap Gaussian built once instead of on every GaussianBlur call
+    blur_kernel = cv2.getGaussianKernel(5, 0)
+
+def roi_polygon(height, width):
+    return np.array([[
+        (0, height),
+        (width, height),
+        (int(width * 0.5), int(height * 0.55))
+    ]], dtype=np.int32)
 
 picam2 = Picamera2()
-config = picam2.create_video_configuration({"size": (1280, 720)})
+config = picam2.create_video_configuration({"size": (FRAME_WIDTH, FRAME_HEIGHT), "format": "YUV420"})
 picam2.configure(config)
 picam2.start()
 
 time.sleep(1)
 
-while True:
-    frame = picam2.capture_array()
+# Frame size and ROI are fixed, so build the mask once
+mask = np.zeros((FRAME_HEIGHT, FRAME_WIDTH), dtype=np.uint8)
+cv2.fillPoly(mask, roi_polygon(FRAME_HEIGHT, FRAME_WIDTH), 255)
+if USE_CUDA:
+    gpu_mask = cv2.cuda_GpuMat()
+    gpu_mask.upload(mask)
+else:
+    mask = cv2.UMat(mask)
 
-    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-    blur = cv2.GaussianBlur(gray, (5, 5), 0)
-    edges = cv2.Canny(blur, 50, 150)
+# Capture runs in its own thread and keeps only the newest frame, so camera
+# I/O overlaps with processing and a slow iteration simply skips stale frames
+frame_slot = [None]
+new_frame = threading.Event()
 
-    height, width = edges.shape
-    mask = np.zeros_like(edges)
+def capture_frames():
+    while True:
+        frame_slot[0] = picam2.capture_array()
+        new_frame.set()
 
-    polygon = np.array([[
-        (0, height),
-        (width, height),
-        (int(width * 0.5), int(height * 0.55))
-    ]], dtype=np.int32)
+threading.Thread(target=capture_frames, daemon=True).start()
 
-    cv2.fillPoly(mask, polygon, 255)
-    roi = cv2.bitwise_and(edges, mask)
+while True:
+    new_frame.wait()
+    new_frame.clear()
+    yuv = frame_slot[0]
+    gray = yuv[:FRAME_HEIGHT, :FRAME_WIDTH]  # Y plane is the top rows
+
+    if USE_CUDA:
+        gpu_frame.upload(gray)
+        blur = gpu_blur.apply(gpu_frame)
+        edges = gpu_canny.detect(blur)
+        roi = cv2.cuda.bitwise_and(edges, gpu_mask).download()
+    else:
+        blur = cv2.sepFilter2D(cv2.UMat(gray), -1, blur_kernel, blur_kernel)
+        edges = cv2.Canny(blur, 50, 150)
+        roi = cv2.bitwise_and(edges, mask).get()
 
     # Hough transform:
     lines = cv2.HoughLinesP(
@@ -49,39 +84,41 @@ while True:
         rho=1,
         theta=np.pi/180,
         threshold=50,
-        minLineLength=80,
-        maxLineGap=150
+        minLineLength=40,
+        maxLineGap=75
     )
 
-    left_lines = []
-    right_lines = []
-
     if lines is not None:
-        for line in lines:
-            x1, y1, x2, y2 = line[0]
-            slope = (y2 - y1) / (x2 - x1 + 1e-6)
-
-            # Only accept strong lane-like slopes
-            if slope < -0.4:
-                left_lines.append((x1, y1, x2, y2))
-            elif slope > 0.4:
-                right_lines.append((x1, y1, x2, y2))
-
-    # Smooth lanes using history
-    if left_lines:
-        left_history.append(average_lane(left_lines))
-    if right_lines:
-        right_history.append(average_lane(right_lines))
-
-    left_lane = average_lane(left_history)
-    right_lane = average_lane(right_history)
-
-    # Draw stabilized lanes
-    if left_lane:
-        cv2.line(frame, (left_lane[0], left_lane[1]), (left_lane[2], left_lane[3]), (0,255,0), 5)
-
-    if right_lane:
-        cv2.line(frame, (right_lane[0], right_lane[1]), (right_lane[2], right_lane[3]), (0,255,0), 5)
+        # (N, 1, 4) -> (N, 4); slopes for every segment in one pass
+        pts = lines.reshape(-1, 4).astype(np.float32)
+        dx = pts[:, 2] - pts[:, 0]
+        dy = pts[:, 3] - pts[:, 1]
+        slope = dy / (dx + 1e-6)
+
+        # Only accept strong lane-like slopes
+        left_mask = slope < -0.4
+        right_mask = slope > 0.4
+
+        # Smooth lanes using history
+        if left_mask.any():
+            left_history[left_count % HISTORY_LEN] = pts[left_mask].mean(axis=0)
+            left_count += 1
+        if right_mask.any():
+            right_history[right_count % HISTORY_LEN] = pts[right_mask].mean(axis=0)
+            right_count += 1
+
+    left_lane = left_history[:min(left_count, HISTORY_LEN)].mean(axis=0) if left_count else None
+    right_lane = right_history[:min(right_count, HISTORY_LEN)].mean(axis=0) if right_count else None
+
+    # Draw stabilized lanes (color conversion is only needed for display)
+    frame = cv2.cvtColor(yuv, cv2.COLOR_YUV2BGR_I420)
+    if left_lane is not None:
+        x1, y1, x2, y2 = map(int, left_lane)
+        cv2.line(frame, (x1, y1), (x2, y2), (0,255,0), 5)
+
+    if right_lane is not None:
+        x1, y1, x2, y2 = map(int, right_lane)
+        cv2.line(frame, (x1, y1), (x2, y2), (0,255,0), 5)
 
     cv2.imshow("Stabilized Lane Detection", frame)
 
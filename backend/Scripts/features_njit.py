@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Numba-compiled feature extraction for the driver behavior model.
+
+Builds the 36-feature vector listed in models/feature_names.pkl from the
+sliding analysis window in a single typed pass.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    print("numba not found, feature extraction will run uncompiled. Install with:")
+    print("pip install numba")
+
+    def njit(*args, **kwargs):
+        """Stand-in for numba.njit that returns the function unchanged."""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+N_FEATURES = 36
+
+
+@njit(cache=True, fastmath=True)
+def extract_features(ring, i):
+    """
+    Build the model feature vector for the sample at ring[i].
+
+    Layout: GyroX/Y/Z, AccX/Y/Z, Acc and Gyro magnitude, JerkX/Y/Z and
+    Jerk magnitude, then mean/std/max/min over the window for each of
+    AccX, AccY, AccZ, GyroX, GyroY, GyroZ. std is the sample (ddof=1)
+    standard deviation, as in training.
+
+    Args:
+        ring (np.ndarray): (window_size, 6) float32 window of accel_x..gyro_z
+        i (int): Row of the current sample; ring[i - 1] is the previous one
+
+    Returns:
+        np.ndarray: (N_FEATURES,) float32 feature vector
+    """
+    n = ring.shape[0]
+    prev = (i - 1) % n
+    features = np.empty(N_FEATURES, dtype=np.float32)
+
+    acc_sq = 0.0
+    gyro_sq = 0.0
+    jerk_sq = 0.0
+    for axis in range(3):
+        acc = ring[i, axis]
+        gyro = ring[i, axis + 3]
+        jerk = acc - ring[prev, axis]
+        features[axis] = gyro
+        features[axis + 3] = acc
+        features[axis + 8] = jerk
+        acc_sq += acc * acc
+        gyro_sq += gyro * gyro
+        jerk_sq += jerk * jerk
+    features[6] = np.sqrt(acc_sq)
+    features[7] = np.sqrt(gyro_sq)
+    features[11] = np.sqrt(jerk_sq)
+
+    for axis in range(6):
+        total = 0.0
+        total_sq = 0.0
+        hi = ring[0, axis]
+        lo = ring[0, axis]
+        for row in range(n):
+            v = ring[row, axis]
+            total += v
+            total_sq += v * v
+            if v > hi:
+                hi = v
+            elif v < lo:
+                lo = v
+        mean = total / n
+        # Sample std (ddof=1) to match the training features, which were built
+        # with pandas rolling().std() and its default ddof=1; np.std's ddof=0
+        # would skew every *_std feature by sqrt((n-1)/n)
+        var = (total_sq - n * mean * mean) / (n - 1) if n > 1 else 0.0
+        base = 12 + 4 * axis
+        features[base] = mean
+        features[base + 1] = np.sqrt(var) if var > 0.0 else 0.0
+        features[base + 2] = hi
+        features[base + 3] = lo
+    return features
@@ -1,69 +1,88 @@
 import serial
-import time
+import pynmea2
+import selectors
 
 serial_port = "/dev/ttyAMA0"
 baud_rate = 9600
 
-def parse_gga(fields):
-    if len(fields) < 15:
-        return None
+def parse_gga(msg):
+    sats = msg.num_sats or ""
 
     return {
-        "fix_quality": fields[6],
-        "satellites": int(fields[7]) if fields[7].isdigit() else 0,
-        "hdop": fields[8],
-        "altitude": fields[9]
+        "fix_quality": str(msg.gps_qual or 0),
+        "satellites": int(sats) if sats.isdigit() else 0,
+        "hdop": msg.horizontal_dil,
+        "altitude": msg.altitude
     }
 
-def parse_rmc(fields):
-    if len(fields) < 12:
-        return None
-
+def parse_rmc(msg):
     return {
-        "status": fields[2],
-        "lat": f"{fields[3]} {fields[4]}",
-        "lon": f"{fields[5]} {fields[6]}",
-        "speed_knots": fields[7],
-        "date": fields[9]
+        "status": msg.status,
+        "lat": f"{msg.lat} {msg.lat_dir}",
+        "lon": f"{msg.lon} {msg.lon_dir}",
+        "speed_knots": msg.spd_over_grnd,
+        "date": msg.datestamp
     }
 
+# Sentence handlers keyed on the "$<talker><type>" prefix; GN covers
+# multi-constellation (GPS + GLONASS/Galileo) receivers
+DISPATCH = {
+    "$GPGGA": ("GGA", parse_gga),
+    "$GNGGA": ("GGA", parse_gga),
+    "$GPRMC": ("RMC", parse_rmc),
+    "$GNRMC": ("RMC", parse_rmc),
+}
+
 def read_gps():
     try:
         ser = serial.Serial(serial_port, baudrate=baud_rate, timeout=1)
         print(f"Connected to GPS on {serial_port}.")
         print("Reading data...\n")
 
-        last_gga = None
-        last_rmc = None
+        latest = {"GGA": None, "RMC": None}
         no_sat_counter = 0
-        no_data_counter = 0
-
-        while True:
-            line_bytes = ser.readline()
-
-            # If no bytes came from GPS
-            if not line_bytes:
-                no_data_counter += 1
-                if no_data_counter >= 5:
-                    print("❌ No data received bro.")
-                    no_data_counter = 0
-                continue
-            else:
-                no_data_counter = 0  # Reset counter when data arrives
 
-            # Decode line
-            line = line_bytes.decode("utf-8", errors="ignore").strip()
-            print(line)
+        buf = bytearray()
 
-            # Parse
-            if line.startswith("$GPGGA"):
-                last_gga = parse_gga(line.split(","))
+        # Sleep until the UART has data instead of polling on a timer
+        sel = selectors.DefaultSelector()
+        sel.register(ser, selectors.EVENT_READ)
 
-            elif line.startswith("$GPRMC"):
-                last_rmc = parse_rmc(line.split(","))
+        while True:
+            # If no bytes came from GPS for 5 seconds
+            if not sel.select(timeout=5.0):
+                print("❌ No data received bro.")
+                continue
 
-            # Display status
-            if last_gga:
+            # Drain whatever the UART has buffered in one read
+            buf += ser.read(max(1, ser.in_waiting))
+
+            # Handle every complete sentence in the buffer
+            got_gga = False
+            while b"\n" in buf:
+                line_bytes, _, buf = buf.partition(b"\n")
+
+                # Decode line (NMEA is 7-bit ASCII)
+                line = line_bytes.decode("ascii", errors="ignore").strip()
+                print(line)
+
+                # Parse
+                handler = DISPATCH.get(line[:6])
+                if handler is None:
+                    continue
+                kind, parse = handler
+                try:
+                    latest[kind] = parse(pynmea2.parse(line, check=False))
+                except pynmea2.ParseError:
+                    continue
+                if kind == "GGA":
+                    got_gga = True
+
+            # Display status once per batch that brought a new GGA fix;
+            # most wakeups only deliver part of a sentence
+            last_gga = latest["GGA"]
+            last_rmc = latest["RMC"]
+            if got_gga:
                 sats = last_gga["satellites"]
                 fix = last_gga["fix_quality"]
 
@@ -100,8 +119,6 @@ def read_gps():
 
                 print("------------------------\n")
 
-            time.sleep(0.2)
-
     except KeyboardInterrupt:
         print("\nStopping.")
     except serial.SerialException as e:
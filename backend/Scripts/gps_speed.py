@@ -1,7 +1,12 @@
 import serial
 import pynmea2
 import time
+import json
+import queue
+import socket
+import threading
 import requests
+from requests.adapters import HTTPAdapter
 
 # --- Constants ---
 # Speed conversion factors
@@ -12,20 +17,51 @@ KNOTS_TO_MPS = 0.514444
 SERVER_URL = "http://localhost:8000/emit"
 EMIT_EVENTS = True  # Set to False to disable event emission
 EMIT_INTERVAL = 2.0  # Emit speed updates every 2 seconds
+EVENT_SOCKET_PATH = "/tmp/driver_assist_events.sock"  # Local server's datagram socket
+
+# Keep-alive session and queue so the GPS read loop never waits on HTTP
+_session = requests.Session()
+_session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+_event_queue = queue.Queue(maxsize=16)
+
+# Unix datagram socket to a server on the same host (skips TCP and HTTP)
+_event_sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) if hasattr(socket, "AF_UNIX") else None
+
+
+def _event_worker():
+    """Send queued events to the SSE server in the background."""
+    while True:
+        event_data = _event_queue.get()
+
+        if _event_sock is not None:
+            try:
+                _event_sock.sendto(json.dumps(event_data).encode(), EVENT_SOCKET_PATH)
+                continue
+            except OSError:
+                # No local socket; fall back to HTTP
+                pass
+
+        try:
+            _session.post(SERVER_URL, json=event_data, timeout=0.5)
+        except Exception:
+            # Silently fail if server is not running
+            pass
+
+
+threading.Thread(target=_event_worker, daemon=True).start()
 
 
 def emit_event(event_data):
     """
-    Send event to the SSE server.
-    Fails silently if server is unavailable to not crash the GPS module.
+    Queue event for the SSE server.
+    Drops the event if the queue is full to not stall the GPS module.
     """
     if not EMIT_EVENTS:
         return
 
     try:
-        requests.post(SERVER_URL, json=event_data, timeout=0.1)
-    except Exception:
-        # Silently fail if server is not running
+        _event_queue.put_nowait(event_data)
+    except queue.Full:
         pass
 
 def get_gps_speed():
@@ -45,17 +81,24 @@ def get_gps_speed():
         print("Press Ctrl+C to stop.")
 
         last_emit_time = 0  # Track last event emission time
+        buf = bytearray()  # Raw serial bytes not yet split into sentences
 
         while True:
             try:
-                # Read a line of data from the serial port
-                line = ser.readline().decode('utf-8')
+                # Top up the buffer until it holds a complete sentence
+                if b'\n' not in buf:
+                    buf += ser.read(max(1, ser.in_waiting))
+                    continue
+                line_bytes, _, buf = buf.partition(b'\n')
 
                 # We are only interested in the $GPRMC sentence,
                 # which contains "Recommended Minimum" data including speed.
-                if line.startswith('$GPRMC'):
+                # Match on bytes so other sentences are never decoded.
+                if line_bytes.startswith(b'$GPRMC'):
+                    line = line_bytes.decode('ascii', 'ignore')
+
                     # Parse the NMEA sentence
-                    msg = pynmea2.parse(line)
+                    msg = pynmea2.parse(line, check=False)
 
                     # Check if the GPS has a valid fix (Status 'A')
                     if msg.status == 'A':
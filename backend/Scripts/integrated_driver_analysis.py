@@ -7,18 +7,24 @@ It logs all sensor data to CSV while providing real-time feedback on driving beh
 """
 
 import time
-import csv
+import os
 import datetime
 import signal
+import struct
 import sys
 import numpy as np
 import pandas as pd
 import joblib
 from pathlib import Path
 import argparse
-from collections import deque
 import json
+import queue
+import threading
+from collections import deque
+from math import sqrt
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
 
 try:
     import smbus
@@ -27,8 +33,34 @@ except ImportError:
     print("pip install smbus")
     sys.exit(1)
 
+try:
+    import onnxruntime as ort
+except ImportError:
+    ort = None  # fall back to the scikit-learn prediction path
+
+from features_njit import N_FEATURES, extract_features
 from predict_driver_behavior import predict_from_raw_sensors
 
+try:
+    from predict_driver_behavior import predict_from_raw_sensors_batch
+except ImportError:
+    def predict_from_raw_sensors_batch(samples):
+        """
+        Predict a batch of samples with the per-sample predictor.
+
+        Args:
+            samples (np.ndarray): (K, 6) rows of acc_x, acc_y, acc_z, gyro_x, gyro_y, gyro_z
+
+        Returns:
+            tuple: (K,) predicted classes and (K,) confidences
+        """
+        results = [
+            predict_from_raw_sensors(gyro_x=gx, gyro_y=gy, gyro_z=gz, acc_x=ax, acc_y=ay, acc_z=az)
+            for ax, ay, az, gx, gy, gz in samples.tolist()
+        ]
+        return (np.array([r['predicted_class'] for r in results]),
+                np.array([r['confidence'] for r in results]))
+
 # Server configuration for event emission
 SERVER_URL = "http://localhost:8000/emit"
 EMIT_EVENTS = True  # Set to False to disable event emission
@@ -37,19 +69,99 @@ EMIT_EVENTS = True  # Set to False to disable event emission
 HARD_BRAKE_THRESHOLD = 1.5  # g-force threshold for hard braking
 MODERATE_BRAKE_THRESHOLD = 1.0  # g-force threshold for moderate braking
 
-def emit_event(event_data):
+# Event message templates
+_HARD_BRAKE_MSG = '⚠️ HARD BRAKING DETECTED at %d mph! Maintain safe following distance.'
+_MODERATE_BRAKE_MSG = '⚡ Moderate braking at %d mph. Monitor traffic ahead.'
+_BEHAVIOR_CHANGE_MSG = '⚠️ %s detected! Risk Level: %s'
+
+# Batch inference: predict once this many samples are pending, or once the
+# oldest pending sample is this old
+BATCH_SIZE = 10
+BATCH_MAX_AGE_NS = 200_000_000  # 200 ms
+
+# Behavior classification, indexed by class id (0 = no prediction yet)
+_BEHAVIOR_TYPES = ("Unknown", "Normal Driving", "Moderate Driving", "Aggressive Driving", "Dangerous Driving")
+_RISK_LEVELS = ("Unknown", "Low", "Low-Medium", "High", "Very High")
+
+# Rough speed estimate per behavior class (mph) until the GPS module is integrated
+_SPEED_BY_CLASS = (45, 35, 50, 60, 70)
+
+# Burst read layout from ACCEL_XOUT_H: accel x/y/z, temperature, gyro x/y/z
+# as big-endian signed 16-bit words
+_ACCEL_GYRO_STRUCT = struct.Struct('>hhhhhhh')
+
+# CSV log columns and the matching positional row format; the trailing field
+# is the pre-formatted behavior suffix (class, type, risk level, confidence)
+_CSV_FIELDS = (
+    'timestamp_ns', 'sample_number',
+    'accel_x', 'accel_y', 'accel_z',
+    'gyro_x', 'gyro_y', 'gyro_z',
+    'accel_magnitude', 'gyro_magnitude',
+    'behavior_class', 'behavior_type', 'risk_level', 'confidence'
+)
+_ROW_FMT = "{},{},{:.6f},{:.6f},{:.6f},{:.6f},{:.6f},{:.6f},{:.6f},{:.6f},{}\n"
+
+
+def export_onnx_model(model_path, onnx_path):
     """
-    Send event to the SSE server.
-    Fails silently if server is unavailable to not crash the detection module.
+    Convert the pickled scikit-learn model to ONNX.
+
+    Args:
+        model_path (str): Path to the joblib-pickled classifier
+        onnx_path (str): Destination of the .onnx file
     """
-    if not EMIT_EVENTS:
-        return
+    from skl2onnx import convert_sklearn
+    from skl2onnx.common.data_types import FloatTensorType
+
+    model = joblib.load(model_path)
+    onx = convert_sklearn(
+        model,
+        initial_types=[('X', FloatTensorType([None, N_FEATURES]))],
+        options={id(model): {'zipmap': False}}  # probabilities as a plain tensor
+    )
+    Path(onnx_path).write_bytes(onx.SerializeToString())
+    print(f"ONNX model saved to {onnx_path}")
+
+
+def _ns_to_iso(ts_ns):
+    """Format a time.time_ns() timestamp as a local ISO-8601 string."""
+    return datetime.datetime.fromtimestamp(ts_ns / 1e9).isoformat()
 
-    try:
-        requests.post(SERVER_URL, json=event_data, timeout=0.1)
-    except Exception:
-        # Silently fail if server is not running
-        pass
+
+class _BehaviorSnapshot:
+    """Result of one behavior analysis; slotted to keep per-analysis allocation small."""
+
+    __slots__ = ('cls', 'confidence', 'behavior_type', 'risk_level',
+                 'timestamp', 'accel_magnitude', 'gyro_magnitude')
+
+    def __init__(self, cls, confidence, behavior_type, risk_level,
+                 timestamp, accel_magnitude, gyro_magnitude):
+        self.cls = cls
+        self.confidence = confidence
+        self.behavior_type = behavior_type
+        self.risk_level = risk_level
+        self.timestamp = timestamp  # time.time_ns(); formatted when saved
+        self.accel_magnitude = accel_magnitude
+        self.gyro_magnitude = gyro_magnitude
+
+    def to_dict(self):
+        """Return the snapshot as a JSON-ready dict with an ISO timestamp."""
+        return {
+            'class': self.cls,
+            'confidence': self.confidence,
+            'behavior_type': self.behavior_type,
+            'risk_level': self.risk_level,
+            'timestamp': _ns_to_iso(self.timestamp),
+            'accel_magnitude': self.accel_magnitude,
+            'gyro_magnitude': self.gyro_magnitude
+        }
+
+
+# Shared keep-alive HTTP session for event emission; the single pooled
+# connection to the local server is reused instead of reconnecting per event
+_session = requests.Session()
+_session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+_JSON_HEADERS = {'Content-Type': 'application/json'}
 
 
 class IntegratedDriverAnalysis:
@@ -71,7 +183,8 @@ class IntegratedDriverAnalysis:
     GYRO_ZOUT_H = 0x47
     
     def __init__(self, output_dir="logs", sample_rate=50, window_size=50, 
-                 model_path="models/driver_behavior_model.pkl", bus=1, address=0x68):
+                 model_path="models/driver_behavior_model.pkl", bus=1, address=0x68,
+                 batch_size=BATCH_SIZE, onnx_path="models/random_forest_model.onnx"):
         """
         Initialize the integrated analysis system.
         
@@ -82,6 +195,8 @@ class IntegratedDriverAnalysis:
             model_path (str): Path to trained model
             bus (int): I2C bus number
             address (int): I2C address of MPU6050
+            batch_size (int): Number of samples predicted per model call
+            onnx_path (str): Path to the ONNX export of the model, preferred when present
         """
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
@@ -96,43 +211,74 @@ class IntegratedDriverAnalysis:
         
         # Data logging
         self.csv_file = None
-        self.csv_writer = None
+        self.flush_every = sample_rate * 2  # rows between flushes (~2 s of data)
+        
+        # Rows are formatted on the sampling thread and written by a background
+        # writer so the sampling loop never touches the filesystem
+        self._csv_q = queue.Queue(maxsize=1024)
+        self._csv_thread = None
+        self.csv_rows_dropped = 0
         self.sample_count = 0
         self.running = False
         
-        # Analysis buffers
-        self.accel_buffer = deque(maxlen=window_size)
-        self.gyro_buffer = deque(maxlen=window_size)
-        self.timestamp_buffer = deque(maxlen=window_size)
+        # Analysis window: ring buffer with one row of
+        # (accel_x, accel_y, accel_z, gyro_x, gyro_y, gyro_z) per sample
+        self._ring = np.zeros((window_size, 6), dtype=np.float32)
+        self._ring_ts = np.zeros(window_size, dtype=np.int64)  # time.time_ns() per sample
+        self._ring_idx = 0  # slot the next sample is written to
+        self._ring_full = False
         
         # Analysis results
         self.current_behavior = None
-        self.behavior_history = []
+        self.behavior_history = deque(maxlen=100)  # Keep only recent history
         self.analysis_count = 0
+        self._stats_printed_at = 0  # analysis_count when statistics were last printed
+        
+        # Session statistics, updated once per analysis
+        self._behavior_counts = {1: 0, 2: 0, 3: 0, 4: 0}
+        self._confidence_sum = 0.0
+        self._confidence_n = 0
+        
+        # Samples waiting for the next batched prediction
+        self.batch_size = batch_size
+        self._pending_windows = []  # feature vector, or the raw sample when no model loaded
+        self._pending_meta = []  # (time.time_ns(), accel_magnitude, gyro_magnitude) per pending sample
+        
+        # Magnitudes of the latest sample, shared by analysis and logging
+        self._accel_magnitude = 0.0
+        self._gyro_magnitude = 0.0
+        
+        # Behavior columns of the CSV row, re-formatted only when behavior changes
+        self._cached_log_suffix = "0,Unknown,Unknown,0.0000"
 
         # Track last behavior to detect changes
         self.last_emitted_behavior = None
         self.last_brake_event_time = 0
         
+        # Brake event reused across emits; only the dynamic fields are updated
+        self._brake_event_tmpl = {
+            'module': 'Brake Checking',
+            'eventType': None,
+            'force': 0,
+            'speed': 0,
+            'behavior_class': 0,
+            'accel_magnitude': 0.0,
+            'severity': None,
+            'message': None
+        }
+        
+        # Events are posted by a background thread so HTTP never blocks sampling
+        self._event_q = queue.Queue(maxsize=32)
+        threading.Thread(target=self._event_worker, daemon=True).start()
+        
         # Load model
         self.model_path = model_path
+        self.onnx_path = onnx_path
+        self._ort = None
+        self._ort_input = None
+        self.model = None
         self.load_model()
         
-        # Behavior classification
-        self.behavior_types = {
-            1: "Normal Driving",
-            2: "Moderate Driving", 
-            3: "Aggressive Driving",
-            4: "Dangerous Driving"
-        }
-        
-        self.risk_levels = {
-            1: "Low",
-            2: "Low-Medium",
-            3: "High",
-            4: "Very High"
-        }
-        
         # Create filename with timestamp
         timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
         self.filename = self.output_dir / f"integrated_analysis_{timestamp}.csv"
@@ -163,44 +309,33 @@ class IntegratedDriverAnalysis:
             print(f"Failed to initialize MPU6050: {e}")
             self.initialized = False
     
-    def read_word_2c(self, addr):
-        """Read a 16-bit signed value from the MPU6050."""
-        high = self.bus.read_byte_data(self.address, addr)
-        low = self.bus.read_byte_data(self.address, addr + 1)
-        val = (high << 8) + low
-        if val >= 0x8000:
-            return -((65535 - val) + 1)
-        else:
-            return val
-    
     def get_sensor_data(self):
-        """Get current sensor data from MPU6050."""
+        """
+        Get current sensor data from MPU6050.
+        
+        Returns:
+            tuple: (accel_x, accel_y, accel_z, gyro_x, gyro_y, gyro_z) in g and °/s,
+            or None if the sensor is not initialized
+        """
         if not self.initialized:
             return None
             
-        # Get accelerometer data
-        accel_x = self.read_word_2c(self.ACCEL_XOUT_H) / 16384.0
-        accel_y = self.read_word_2c(self.ACCEL_YOUT_H) / 16384.0
-        accel_z = self.read_word_2c(self.ACCEL_ZOUT_H) / 16384.0
-        
-        # Get gyroscope data
-        gyro_x = self.read_word_2c(self.GYRO_XOUT_H) / 131.0
-        gyro_y = self.read_word_2c(self.GYRO_YOUT_H) / 131.0
-        gyro_z = self.read_word_2c(self.GYRO_ZOUT_H) / 131.0
+        # Read accel, temperature and gyro registers (0x3B-0x48) in one I2C
+        # transaction; the MPU6050 auto-increments the register address
+        raw = self.bus.read_i2c_block_data(self.address, self.ACCEL_XOUT_H, 14)
+        ax, ay, az, _temp, gx, gy, gz = _ACCEL_GYRO_STRUCT.unpack(bytes(raw))
         
-        return {
-            'accel_x': accel_x,
-            'accel_y': accel_y,
-            'accel_z': accel_z,
-            'gyro_x': gyro_x,
-            'gyro_y': gyro_y,
-            'gyro_z': gyro_z
-        }
+        return (ax / 16384.0, ay / 16384.0, az / 16384.0,
+                gx / 131.0, gy / 131.0, gz / 131.0)
     
     def load_model(self):
-        """Load the trained model."""
+        """Load the trained model, preferring the ONNX Runtime session."""
         try:
-            if Path(self.model_path).exists():
+            if ort is not None and Path(self.onnx_path).exists():
+                self._ort = ort.InferenceSession(str(self.onnx_path), providers=['CPUExecutionProvider'])
+                self._ort_input = self._ort.get_inputs()[0].name
+                print("ONNX model loaded successfully")
+            elif Path(self.model_path).exists():
                 self.model = joblib.load(self.model_path)
                 print("Model loaded successfully")
             else:
@@ -209,20 +344,34 @@ class IntegratedDriverAnalysis:
         except Exception as e:
             print(f"Error loading model: {e}")
             print("Using basic prediction function")
+        
+        self.warm_up_model()
+    
+    def warm_up_model(self):
+        """
+        Run one dummy prediction so lazy imports, JIT compilation and session
+        setup happen now rather than when the first window fills mid-capture.
+        """
+        try:
+            if self._ort is not None:
+                features = extract_features(self._ring, 0)  # compiles the numba kernel
+                self._ort.run(None, {self._ort_input: features.reshape(1, -1)})
+            elif self.model is not None:
+                features = extract_features(self._ring, 0)
+                self.model.predict_proba(features.reshape(1, -1))
+            else:
+                predict_from_raw_sensors(gyro_x=0.0, gyro_y=0.0, gyro_z=0.0,
+                                         acc_x=0.0, acc_y=0.0, acc_z=1.0)
+        except Exception as e:
+            print(f"Model warm-up failed: {e}")
     
     def start_logging(self):
         """Start data logging to CSV file."""
         try:
-            self.csv_file = open(self.filename, 'w', newline='')
-            fieldnames = [
-                'timestamp', 'sample_number', 
-                'accel_x', 'accel_y', 'accel_z',
-                'gyro_x', 'gyro_y', 'gyro_z',
-                'accel_magnitude', 'gyro_magnitude',
-                'behavior_class', 'behavior_type', 'risk_level', 'confidence'
-            ]
-            self.csv_writer = csv.DictWriter(self.csv_file, fieldnames=fieldnames)
-            self.csv_writer.writeheader()
+            self.csv_file = open(self.filename, 'w', buffering=8192)
+            self.csv_file.write(','.join(_CSV_FIELDS) + '\n')
+            self._csv_thread = threading.Thread(target=self._csv_worker, daemon=True)
+            self._csv_thread.start()
             self.running = True
             print(f"Started integrated logging to {self.filename}")
             print("Press Ctrl+C to stop")
@@ -236,54 +385,102 @@ class IntegratedDriverAnalysis:
         Analyze driver behavior using current sensor data.
         
         Args:
-            sensor_data (dict): Current sensor readings
+            sensor_data (tuple): Current sensor readings from get_sensor_data
         """
         try:
-            # Add to buffers
-            accel_data = (sensor_data['accel_x'], sensor_data['accel_y'], sensor_data['accel_z'])
-            gyro_data = (sensor_data['gyro_x'], sensor_data['gyro_y'], sensor_data['gyro_z'])
+            # Add to window
+            ax, ay, az, gx, gy, gz = sensor_data
             
-            self.accel_buffer.append(accel_data)
-            self.gyro_buffer.append(gyro_data)
-            self.timestamp_buffer.append(datetime.datetime.now().isoformat())
+            i = self._ring_idx
+            self._ring[i] = sensor_data
+            self._ring_ts[i] = time.time_ns()
+            self._ring_idx = (i + 1) % self.window_size
+            if self._ring_idx == 0:
+                self._ring_full = True
             
-            # Analyze when buffer is full
-            if len(self.accel_buffer) == self.window_size:
-                # Make prediction
-                result = predict_from_raw_sensors(
-                    gyro_x=sensor_data['gyro_x'],
-                    gyro_y=sensor_data['gyro_y'],
-                    gyro_z=sensor_data['gyro_z'],
-                    acc_x=sensor_data['accel_x'],
-                    acc_y=sensor_data['accel_y'],
-                    acc_z=sensor_data['accel_z']
-                )
-                
-                # Store current behavior
-                self.current_behavior = {
-                    'class': result['predicted_class'],
-                    'confidence': result['confidence'],
-                    'behavior_type': self.behavior_types[result['predicted_class']],
-                    'risk_level': self.risk_levels[result['predicted_class']],
-                    'timestamp': self.timestamp_buffer[-1],
-                    'accel_magnitude': np.linalg.norm(accel_data),
-                    'gyro_magnitude': np.linalg.norm(gyro_data)
-                }
+            self._accel_magnitude = accel_magnitude = sqrt(ax*ax + ay*ay + az*az)
+            self._gyro_magnitude = gyro_magnitude = sqrt(gx*gx + gy*gy + gz*gz)
+            
+            # Queue samples once the window is full; predict in batches
+            if self._ring_full:
+                if self._ort is not None or self.model is not None:
+                    self._pending_windows.append(extract_features(self._ring, i))
+                else:
+                    self._pending_windows.append(sensor_data)
+                self._pending_meta.append((int(self._ring_ts[i]), accel_magnitude, gyro_magnitude))
                 
-                self.behavior_history.append(self.current_behavior.copy())
-                self.analysis_count += 1
-
-                # Emit events for significant behaviors or braking
-                self.check_and_emit_events(sensor_data)
-
-                # Keep only recent history
-                if len(self.behavior_history) > 100:
-                    self.behavior_history = self.behavior_history[-100:]
+                if (len(self._pending_windows) >= self.batch_size or
+                        self._ring_ts[i] - self._pending_meta[0][0] >= BATCH_MAX_AGE_NS):
+                    self._predict_pending()
                     
         except Exception as e:
             print(f"Error in behavior analysis: {e}")
 
-    def check_and_emit_events(self, sensor_data):
+    def _predict_pending(self):
+        """Run one model call over the pending samples and record each result."""
+        samples = np.array(self._pending_windows, dtype=np.float32)
+        meta = self._pending_meta
+        self._pending_windows = []
+        self._pending_meta = []
+        
+        if self._ort is not None:
+            classes, probs = self._ort.run(None, {self._ort_input: samples})
+            confidences = probs.max(axis=1)
+        elif self.model is not None:
+            # One predict_proba call over the batch; the feature vector is in
+            # the model's training column order (models/feature_names.pkl)
+            probs = self.model.predict_proba(samples)
+            classes = self.model.classes_[probs.argmax(axis=1)]
+            confidences = probs.max(axis=1)
+        else:
+            classes, confidences = predict_from_raw_sensors_batch(samples)
+        
+        for (ts, accel_magnitude, gyro_magnitude), behavior_class, confidence in zip(
+                meta, classes.tolist(), confidences.tolist()):
+            # Store current behavior
+            self.current_behavior = _BehaviorSnapshot(
+                behavior_class, confidence,
+                _BEHAVIOR_TYPES[behavior_class], _RISK_LEVELS[behavior_class],
+                ts, accel_magnitude, gyro_magnitude
+            )
+            
+            self.behavior_history.append(self.current_behavior)
+            self.analysis_count += 1
+            self._behavior_counts[behavior_class] += 1
+            self._confidence_sum += confidence
+            self._confidence_n += 1
+            
+            # Emit events for significant behaviors or braking
+            self.check_and_emit_events()
+        
+        b = self.current_behavior
+        self._cached_log_suffix = f"{b.cls},{b.behavior_type},{b.risk_level},{b.confidence:.4f}"
+
+    def _event_worker(self):
+        """Post queued events to the SSE server."""
+        while True:
+            event_data = self._event_q.get()
+            try:
+                _session.post(SERVER_URL, data=orjson.dumps(event_data),
+                              headers=_JSON_HEADERS, timeout=0.5)
+            except Exception:
+                # Silently fail if server is not running
+                pass
+
+    def emit_event(self, event_data):
+        """
+        Queue event for the SSE server.
+        Drops the event if the queue is full to not stall the sampling loop.
+        """
+        if not EMIT_EVENTS:
+            return
+
+        try:
+            self._event_q.put_nowait(event_data)
+        except queue.Full:
+            pass
+
+    def check_and_emit_events(self):
         """
         Check for significant events and emit to server.
         Emits brake events based on acceleration magnitude.
@@ -291,53 +488,34 @@ class IntegratedDriverAnalysis:
         if not self.current_behavior:
             return
 
-        accel_mag = self.current_behavior['accel_magnitude']
-        behavior_class = self.current_behavior['class']
+        accel_mag = self.current_behavior.accel_magnitude
+        behavior_class = self.current_behavior.cls
         current_time = time.time()
 
         # Estimate speed from behavior (rough estimation for prototype)
         # In production, integrate with GPS module
-        estimated_speed_mph = 45  # Default estimate
-        if behavior_class == 1:  # Normal
-            estimated_speed_mph = 35
-        elif behavior_class == 2:  # Moderate
-            estimated_speed_mph = 50
-        elif behavior_class == 3:  # Aggressive
-            estimated_speed_mph = 60
-        elif behavior_class == 4:  # Dangerous
-            estimated_speed_mph = 70
+        estimated_speed_mph = _SPEED_BY_CLASS[behavior_class]
 
         # Check for brake events based on acceleration magnitude
         # Cooldown: Don't emit events more frequently than every 2 seconds
-        if current_time - self.last_brake_event_time > 2.0:
-            brake_event = None
-
+        if current_time - self.last_brake_event_time > 2.0 and accel_mag > MODERATE_BRAKE_THRESHOLD:
+            brake_event = self._brake_event_tmpl
             if accel_mag > HARD_BRAKE_THRESHOLD:
-                brake_event = {
-                    'module': 'Brake Checking',
-                    'eventType': 'hard',
-                    'force': min(100, int(accel_mag * 50)),  # Convert to 0-100 scale
-                    'speed': estimated_speed_mph,
-                    'behavior_class': behavior_class,
-                    'accel_magnitude': round(accel_mag, 2),
-                    'severity': 'high',
-                    'message': f'⚠️ HARD BRAKING DETECTED at {estimated_speed_mph} mph! Maintain safe following distance.'
-                }
-            elif accel_mag > MODERATE_BRAKE_THRESHOLD:
-                brake_event = {
-                    'module': 'Brake Checking',
-                    'eventType': 'moderate',
-                    'force': min(100, int(accel_mag * 50)),
-                    'speed': estimated_speed_mph,
-                    'behavior_class': behavior_class,
-                    'accel_magnitude': round(accel_mag, 2),
-                    'severity': 'moderate',
-                    'message': f'⚡ Moderate braking at {estimated_speed_mph} mph. Monitor traffic ahead.'
-                }
-
-            if brake_event:
-                emit_event(brake_event)
-                self.last_brake_event_time = current_time
+                brake_event['eventType'] = 'hard'
+                brake_event['severity'] = 'high'
+                brake_event['message'] = _HARD_BRAKE_MSG % estimated_speed_mph
+            else:
+                brake_event['eventType'] = 'moderate'
+                brake_event['severity'] = 'moderate'
+                brake_event['message'] = _MODERATE_BRAKE_MSG % estimated_speed_mph
+            brake_event['force'] = min(100, int(accel_mag * 50))  # Convert to 0-100 scale
+            brake_event['speed'] = estimated_speed_mph
+            brake_event['behavior_class'] = behavior_class
+            brake_event['accel_magnitude'] = round(accel_mag, 2)
+
+            # Queue a copy; the worker serializes it after the template changes
+            self.emit_event(brake_event.copy())
+            self.last_brake_event_time = current_time
 
         # Emit behavior change events (only for Aggressive/Dangerous driving)
         if behavior_class >= 3 and self.last_emitted_behavior != behavior_class:
@@ -345,108 +523,103 @@ class IntegratedDriverAnalysis:
                 'module': 'Brake Checking',
                 'eventType': 'behavior_change',
                 'behavior_class': behavior_class,
-                'behavior_type': self.current_behavior['behavior_type'],
-                'risk_level': self.current_behavior['risk_level'],
-                'confidence': round(self.current_behavior['confidence'], 2),
+                'behavior_type': self.current_behavior.behavior_type,
+                'risk_level': self.current_behavior.risk_level,
+                'confidence': round(self.current_behavior.confidence, 2),
                 'severity': 'high' if behavior_class == 4 else 'moderate',
-                'message': f'⚠️ {self.current_behavior["behavior_type"]} detected! Risk Level: {self.current_behavior["risk_level"]}'
+                'message': _BEHAVIOR_CHANGE_MSG % (self.current_behavior.behavior_type,
+                                                   self.current_behavior.risk_level)
             }
-            emit_event(behavior_event)
+            self.emit_event(behavior_event)
             self.last_emitted_behavior = behavior_class
 
+    def _csv_worker(self):
+        """Write queued CSV rows in batches until the None sentinel arrives."""
+        unflushed = 0
+        while True:
+            rows = [self._csv_q.get()]
+            while len(rows) < 64 and not self._csv_q.empty():
+                rows.append(self._csv_q.get_nowait())
+            
+            stop = rows[-1] is None
+            if stop:
+                rows.pop()
+            self.csv_file.writelines(rows)
+            
+            # Flush periodically rather than per row to let the page cache coalesce writes
+            unflushed += len(rows)
+            if unflushed >= self.flush_every:
+                self.csv_file.flush()
+                unflushed = 0
+            
+            if stop:
+                return
+
     def log_data(self, sensor_data):
         """
         Log sensor data and analysis to CSV.
         
         Args:
-            sensor_data (dict): Sensor data from MPU6050
+            sensor_data (tuple): Sensor data from get_sensor_data
         """
-        if not self.running or self.csv_writer is None:
+        if not self.running or self.csv_file is None:
             return
             
         try:
-            timestamp = datetime.datetime.now().isoformat()
+            timestamp = time.time_ns()
             self.sample_count += 1
             
-            # Calculate magnitudes
-            accel_magnitude = np.sqrt(
-                sensor_data['accel_x']**2 + 
-                sensor_data['accel_y']**2 + 
-                sensor_data['accel_z']**2
-            )
-            gyro_magnitude = np.sqrt(
-                sensor_data['gyro_x']**2 + 
-                sensor_data['gyro_y']**2 + 
-                sensor_data['gyro_z']**2
-            )
-            
-            # Get current behavior info
-            behavior_class = self.current_behavior['class'] if self.current_behavior else 0
-            behavior_type = self.current_behavior['behavior_type'] if self.current_behavior else "Unknown"
-            risk_level = self.current_behavior['risk_level'] if self.current_behavior else "Unknown"
-            confidence = self.current_behavior['confidence'] if self.current_behavior else 0.0
-            
-            # Write data to CSV
-            row = {
-                'timestamp': timestamp,
-                'sample_number': self.sample_count,
-                'accel_x': sensor_data['accel_x'],
-                'accel_y': sensor_data['accel_y'],
-                'accel_z': sensor_data['accel_z'],
-                'gyro_x': sensor_data['gyro_x'],
-                'gyro_y': sensor_data['gyro_y'],
-                'gyro_z': sensor_data['gyro_z'],
-                'accel_magnitude': accel_magnitude,
-                'gyro_magnitude': gyro_magnitude,
-                'behavior_class': behavior_class,
-                'behavior_type': behavior_type,
-                'risk_level': risk_level,
-                'confidence': confidence
-            }
-            
-            self.csv_writer.writerow(row)
-            self.csv_file.flush()
+            # Queue row for the CSV writer; magnitudes and behavior columns
+            # were computed by analyze_behavior for this sample
+            self._csv_q.put_nowait(_ROW_FMT.format(
+                timestamp, self.sample_count, *sensor_data,
+                self._accel_magnitude, self._gyro_magnitude,
+                self._cached_log_suffix
+            ))
             
+        except queue.Full:
+            # Writer fell behind; drop the row rather than stall sampling
+            self.csv_rows_dropped += 1
         except Exception as e:
             print(f"Error logging data: {e}")
     
     def print_status(self):
-        """Print current analysis status."""
-        if self.current_behavior:
-            print(f"\n{'='*60}")
-            print(f"Integrated Driver Analysis - Sample {self.sample_count}")
-            print(f"{'='*60}")
-            print(f"Current Behavior: {self.current_behavior['behavior_type']}")
-            print(f"Risk Level: {self.current_behavior['risk_level']}")
-            print(f"Confidence: {self.current_behavior['confidence']:.3f}")
-            print(f"Accel Magnitude: {self.current_behavior['accel_magnitude']:.3f} g")
-            print(f"Gyro Magnitude: {self.current_behavior['gyro_magnitude']:.3f} °/s")
-            print(f"Analyses Completed: {self.analysis_count}")
+        """Print current analysis status once per second of samples."""
+        if self.current_behavior and self.sample_count % self.sample_rate == 0:
+            b = self.current_behavior
+            sys.stdout.write(
+                f"\n{'='*60}\n"
+                f"Integrated Driver Analysis - Sample {self.sample_count}\n"
+                f"{'='*60}\n"
+                f"Current Behavior: {b.behavior_type}\n"
+                f"Risk Level: {b.risk_level}\n"
+                f"Confidence: {b.confidence:.3f}\n"
+                f"Accel Magnitude: {b.accel_magnitude:.3f} g\n"
+                f"Gyro Magnitude: {b.gyro_magnitude:.3f} °/s\n"
+                f"Analyses Completed: {self.analysis_count}\n"
+            )
             
-            # Print statistics every 20 analyses
-            if self.analysis_count % 20 == 0 and self.analysis_count > 0:
+            # Print statistics once at least 20 analyses have completed since the last time
+            if self.analysis_count - self._stats_printed_at >= 20:
+                self._stats_printed_at = self.analysis_count
                 self.print_statistics()
     
     def print_statistics(self):
         """Print analysis statistics."""
-        if not self.behavior_history:
+        if not self._confidence_n:
             return
             
-        # Calculate statistics
-        classes = [b['class'] for b in self.behavior_history]
-        
-        # Count behavior types
+        # Read the incrementally maintained statistics
         behavior_counts = {}
-        for class_id, behavior_type in self.behavior_types.items():
-            behavior_counts[behavior_type] = classes.count(class_id)
+        for class_id in range(1, len(_BEHAVIOR_TYPES)):
+            behavior_type = _BEHAVIOR_TYPES[class_id]
+            behavior_counts[behavior_type] = self._behavior_counts[class_id]
         
-        # Calculate average confidence
-        confidences = [b['confidence'] for b in self.behavior_history]
-        avg_confidence = np.mean(confidences)
+        avg_confidence = self._confidence_sum / self._confidence_n
         
         # Determine dominant behavior
-        dominant_class = max(set(classes), key=classes.count)
-        dominant_behavior = self.behavior_types[dominant_class]
+        dominant_class = max(self._behavior_counts, key=self._behavior_counts.get)
+        dominant_behavior = _BEHAVIOR_TYPES[dominant_class]
         
         print(f"\n--- Session Statistics ---")
         print(f"Total Samples: {self.sample_count}")
@@ -458,27 +631,35 @@ class IntegratedDriverAnalysis:
             percentage = (count / self.analysis_count) * 100
             print(f"  {behavior}: {count} ({percentage:.1f}%)")
     
-    def save_analysis_summary(self):
-        """Save analysis summary to JSON file."""
-        if not self.behavior_history:
+    def save_analysis_summary(self, verbose=True):
+        """
+        Save analysis summary to JSON file.
+        
+        Args:
+            verbose (bool): Print the destination once saved
+        """
+        if not self._confidence_n:
             return
             
-        # Calculate final statistics
-        classes = [b['class'] for b in self.behavior_history]
-        confidences = [b['confidence'] for b in self.behavior_history]
-        
+        # Read the incrementally maintained statistics
         behavior_counts = {}
-        for class_id, behavior_type in self.behavior_types.items():
-            behavior_counts[behavior_type] = classes.count(class_id)
+        for class_id in range(1, len(_BEHAVIOR_TYPES)):
+            behavior_type = _BEHAVIOR_TYPES[class_id]
+            behavior_counts[behavior_type] = self._behavior_counts[class_id]
+        
+        avg_confidence = self._confidence_sum / self._confidence_n
+        dominant_class = max(self._behavior_counts, key=self._behavior_counts.get)
+        dominant_behavior = _BEHAVIOR_TYPES[dominant_class]
         
-        avg_confidence = np.mean(confidences)
-        dominant_class = max(set(classes), key=classes.count)
-        dominant_behavior = self.behavior_types[dominant_class]
+        # Oldest and newest samples currently held in the window
+        has_samples = self._ring_full or self._ring_idx > 0
+        oldest = self._ring_idx if self._ring_full else 0
+        newest = (self._ring_idx - 1) % self.window_size
         
         summary = {
             'session_info': {
-                'start_time': self.timestamp_buffer[0] if self.timestamp_buffer else None,
-                'end_time': self.timestamp_buffer[-1] if self.timestamp_buffer else None,
+                'start_time': _ns_to_iso(self._ring_ts[oldest]) if has_samples else None,
+                'end_time': _ns_to_iso(self._ring_ts[newest]) if has_samples else None,
                 'total_samples': self.sample_count,
                 'total_analyses': self.analysis_count,
                 'sample_rate': self.sample_rate,
@@ -488,7 +669,9 @@ class IntegratedDriverAnalysis:
                 'dominant_behavior': dominant_behavior,
                 'average_confidence': avg_confidence,
                 'behavior_distribution': behavior_counts,
-                'behavior_history': self.behavior_history[-50:]  # Last 50 analyses
+                'behavior_history': [  # Last 50 analyses
+                    b.to_dict() for b in list(self.behavior_history)[-50:]
+                ]
             },
             'files_created': {
                 'data_log': str(self.filename),
@@ -498,18 +681,28 @@ class IntegratedDriverAnalysis:
         
         try:
             with open(self.analysis_filename, 'w') as f:
-                json.dump(summary, f, indent=2)
-            print(f"Analysis summary saved to {self.analysis_filename}")
+                json.dump(summary, f, separators=(',', ':'))
+            if verbose:
+                print(f"Analysis summary saved to {self.analysis_filename}")
         except Exception as e:
             print(f"Error saving analysis summary: {e}")
     
     def stop_logging(self):
         """Stop data logging and close files."""
         self.running = False
-        if self.csv_file:
+        if self._csv_thread is not None:
+            # Let the writer drain the queue before closing the file
+            self._csv_q.put(None)
+            self._csv_thread.join()
+            self._csv_thread = None
+        if self.csv_file and not self.csv_file.closed:
+            self.csv_file.flush()
+            os.fsync(self.csv_file.fileno())
             self.csv_file.close()
             print(f"Stopped logging. Total samples: {self.sample_count}")
             print(f"Data saved to: {self.filename}")
+            if self.csv_rows_dropped:
+                print(f"Rows dropped (writer behind): {self.csv_rows_dropped}")
         
         # Save analysis summary
         self.save_analysis_summary()
@@ -537,9 +730,19 @@ def main():
                        help='I2C address (default: 0x68)')
     parser.add_argument('--model-path', default='models/driver_behavior_model.pkl',
                        help='Path to trained model')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                       help=f'Samples per model prediction (default: {BATCH_SIZE})')
+    parser.add_argument('--onnx-path', default='models/random_forest_model.onnx',
+                       help='Path to ONNX model, used instead of the pickle when present')
+    parser.add_argument('--export-onnx', action='store_true',
+                       help='Convert --model-path to ONNX at --onnx-path and exit')
     
     args = parser.parse_args()
     
+    if args.export_onnx:
+        export_onnx_model(args.model_path, args.onnx_path)
+        return
+    
     # Convert address to integer
     address = int(args.address, 16)
     
@@ -551,7 +754,9 @@ def main():
         window_size=args.window_size,
         model_path=args.model_path,
         bus=args.bus,
-        address=address
+        address=address,
+        batch_size=args.batch_size,
+        onnx_path=args.onnx_path
     )
     
     # Initialize MPU6050
@@ -575,10 +780,12 @@ def main():
     print("Starting integrated driver behavior analysis...")
     print("This will log all sensor data and provide real-time behavior analysis")
     
-    # Main analysis loop
+    # Main analysis loop, paced against absolute monotonic deadlines so timer
+    # error does not accumulate across samples
+    period_ns = int(1e9 / analyzer.sample_rate)
+    next_tick_ns = time.monotonic_ns()
     try:
         while analyzer.running:
-            start_time = time.time()
             
             # Read sensor data
             sensor_data = analyzer.get_sensor_data()
@@ -591,11 +798,19 @@ def main():
                 
                 # Print status
                 analyzer.print_status()
+                
+                # Refresh the summary every minute so a crash keeps recent results
+                if analyzer.sample_count % (analyzer.sample_rate * 60) == 0:
+                    analyzer.save_analysis_summary(verbose=False)
             
-            # Maintain sample rate
-            elapsed = time.time() - start_time
-            sleep_time = max(0, analyzer.sample_interval - elapsed)
-            time.sleep(sleep_time)
+            # Maintain sample rate: sleep most of the gap, then spin out the
+            # last millisecond to absorb sleep jitter
+            next_tick_ns += period_ns
+            delay = next_tick_ns - time.monotonic_ns()
+            if delay > 2_000_000:
+                time.sleep((delay - 1_000_000) / 1e9)
+            while time.monotonic_ns() < next_tick_ns:
+                pass
             
     except KeyboardInterrupt:
         pass
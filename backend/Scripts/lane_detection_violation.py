@@ -14,6 +14,18 @@ try:
 except Exception:
     PICAMERA2_AVAILABLE = False
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except Exception:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        # No numba: run the decorated functions as plain Python
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
 import cv2
 import numpy as np
 import csv
@@ -21,13 +33,18 @@ import datetime
 import time
 import os
 import argparse
+import queue
+import threading
 import requests
+from requests.adapters import HTTPAdapter
 
 # -------- GPIO (optional) --------
 GPIO_AVAILABLE = False
 BLINKER_LEFT_PIN = 17   # BCM pins; adjust to your wiring
 BLINKER_RIGHT_PIN = 27
 BUZZER_PIN = 22         # optional buzzer output
+# Blinker levels, kept current by GPIO edge callbacks instead of polling every frame
+_bl_state = {'L': False, 'R': False}
 try:
     import RPi.GPIO as GPIO  # type: ignore
     GPIO.setmode(GPIO.BCM)
@@ -35,6 +52,12 @@ try:
     GPIO.setup(BLINKER_RIGHT_PIN, GPIO.IN, pull_up_down=GPIO.PUD_DOWN)
     # Optional buzzer:
     # GPIO.setup(BUZZER_PIN, GPIO.OUT)
+    _bl_state['L'] = GPIO.input(BLINKER_LEFT_PIN) == GPIO.HIGH
+    _bl_state['R'] = GPIO.input(BLINKER_RIGHT_PIN) == GPIO.HIGH
+    GPIO.add_event_detect(BLINKER_LEFT_PIN, GPIO.BOTH,
+                          callback=lambda ch: _bl_state.__setitem__('L', GPIO.input(ch) == GPIO.HIGH))
+    GPIO.add_event_detect(BLINKER_RIGHT_PIN, GPIO.BOTH,
+                          callback=lambda ch: _bl_state.__setitem__('R', GPIO.input(ch) == GPIO.HIGH))
     GPIO_AVAILABLE = True
 except Exception:
     GPIO_AVAILABLE = False
@@ -42,11 +65,11 @@ except Exception:
 
 
 def blinker_left_on():
-    return GPIO.input(BLINKER_LEFT_PIN) == GPIO.HIGH if GPIO_AVAILABLE else False
+    return _bl_state['L']
 
 
 def blinker_right_on():
-    return GPIO.input(BLINKER_RIGHT_PIN) == GPIO.HIGH if GPIO_AVAILABLE else False
+    return _bl_state['R']
 
 
 def buzz(ms=120):
@@ -62,13 +85,24 @@ FRAME_WIDTH = 640
 FRAME_HEIGHT = 480
 ROI_HEIGHT_RATIO = 0.45
 CANNY_THRESHOLDS = (50, 150)
-MIN_LINE_LENGTH = 50
-MAX_LINE_GAP = 150
+MIN_LINE_LENGTH = 40
+MAX_LINE_GAP = 100
 CENTER_TOLERANCE = 40          # px for "centered"
 DRIFT_MARGIN = 20              # extra px beyond tolerance to confirm drift
 PERSIST_FRAMES = 6             # frames deviation must persist to count as event
 VIOLATION_COOLDOWN_S = 3.0     # minimum time between violation flags
 CSV_LOG_FILE = "lane_log.csv"
+CSV_FLUSH_EVERY = 50           # rows between log flushes
+
+# Lane detection runs on a downscaled frame; deviations are reported in full-frame px
+PROC_SCALE = 2
+PROC_WIDTH = FRAME_WIDTH // PROC_SCALE
+PROC_HEIGHT = FRAME_HEIGHT // PROC_SCALE
+# Coarser Hough accumulator (2 px x 2 deg bins); length/gap/threshold are
+# full-resolution values scaled by PROC_SCALE in detect_lanes
+HOUGH_RHO = 2
+HOUGH_THETA = np.pi / 90
+HOUGH_THRESHOLD = 40
 
 # Smoothing
 EMA_ALPHA = 0.25               # 0..1; higher = more responsive, lower = smoother
@@ -77,57 +111,66 @@ EMA_ALPHA = 0.25               # 0..1; higher = more responsive, lower = smoothe
 SERVER_URL = "http://localhost:8000/emit"
 EMIT_EVENTS = True  # Set to False to disable event emission
 
+# Segment detection on the GPU when OpenCV has CUDA; edges are uploaded into
+# one reusable GpuMat per frame
+USE_CUDA = hasattr(cv2, "cuda") and cv2.cuda.getCudaEnabledDeviceCount() > 0
+if USE_CUDA:
+    gpu_edges = cv2.cuda_GpuMat()
+    gpu_hough = cv2.cuda.createHoughSegmentDetector(
+        HOUGH_RHO, HOUGH_THETA, MIN_LINE_LENGTH // PROC_SCALE, MAX_LINE_GAP // PROC_SCALE,
+        4096, HOUGH_THRESHOLD // PROC_SCALE
+    )
+
 
 # -------------------- LANE DETECTION --------------------
-def region_of_interest(img):
-    height = img.shape[0]
-    polygons = np.array([[
-        (0, height),
-        (FRAME_WIDTH, height),
-        (FRAME_WIDTH, int(height * ROI_HEIGHT_RATIO)),
-        (0, int(height * ROI_HEIGHT_RATIO))
-    ]])
-    mask = np.zeros_like(img)
-    cv2.fillPoly(mask, polygons, 255)
-    return cv2.bitwise_and(img, mask)
-
-
-def detect_lanes(frame_rgb):
-    gray = cv2.cvtColor(frame_rgb, cv2.COLOR_RGB2GRAY)
+# The ROI is the band below ROI_HEIGHT_RATIO; only those rows are processed
+ROI_TOP = int(PROC_HEIGHT * ROI_HEIGHT_RATIO)
+
+
+def detect_lanes(frame, gray_code=cv2.COLOR_RGB2GRAY):
+    """Detect lanes on a downscaled copy; returned lines are in downscaled px.
+    gray_code converts the camera's native channel order straight to grayscale;
+    pass None when the frame is already grayscale (e.g. a YUV420 Y plane).
+    """
+    # Crop to the ROI band first so resize, blur and Canny skip the rows above it
+    roi = frame[int(frame.shape[0] * ROI_HEIGHT_RATIO):]
+    small = cv2.resize(roi, (PROC_WIDTH, PROC_HEIGHT - ROI_TOP), interpolation=cv2.INTER_AREA)
+    gray = small if gray_code is None else cv2.cvtColor(small, gray_code)
     blur = cv2.GaussianBlur(gray, (5, 5), 0)
     edges = cv2.Canny(blur, CANNY_THRESHOLDS[0], CANNY_THRESHOLDS[1])
-    cropped = region_of_interest(edges)
 
-    lines = cv2.HoughLinesP(
-        cropped, 1, np.pi / 180, 50,
-        minLineLength=MIN_LINE_LENGTH, maxLineGap=MAX_LINE_GAP
-    )
+    if USE_CUDA:
+        gpu_edges.upload(edges)
+        segments = gpu_hough.detect(gpu_edges)
+        lines = None if segments.empty() else segments.download()
+    else:
+        lines = cv2.HoughLinesP(
+            edges, HOUGH_RHO, HOUGH_THETA, HOUGH_THRESHOLD // PROC_SCALE,
+            minLineLength=MIN_LINE_LENGTH // PROC_SCALE, maxLineGap=MAX_LINE_GAP // PROC_SCALE
+        )
 
     if lines is None:
         return None, 0, "no_lanes_detected"
 
-    left_lines, right_lines = [], []
-    for line in lines:
-        x1, y1, x2, y2 = line[0]
-        slope = (y2 - y1) / (x2 - x1 + 1e-6)
-        if abs(slope) < 0.5:
-            continue
-        if slope < 0:
-            left_lines.append(line[0])
-        else:
-            right_lines.append(line[0])
+    # Shift segments from ROI-band rows back to downscaled-frame rows
+    arr = lines.reshape(-1, 4)
+    arr[:, 1::2] += ROI_TOP
 
-    if len(left_lines) == 0 or len(right_lines) == 0:
-        return None, 0, "lane_boundary_missing"
+    # Classify all segments at once by slope; near-horizontal ones are dropped
+    x1, y1, x2, y2 = arr.T
+    slope = (y2 - y1) / (x2 - x1 + 1e-6)
+    keep = np.abs(slope) >= 0.5
+    left_lines = arr[keep & (slope < 0)]
+    right_lines = arr[keep & (slope > 0)]
 
-    left_avg = np.mean(left_lines, axis=0).astype(int)
-    right_avg = np.mean(right_lines, axis=0).astype(int)
+    if not left_lines.size or not right_lines.size:
+        return None, 0, "lane_boundary_missing"
 
-    left_x2 = left_avg[2]
-    right_x2 = right_avg[2]
+    left_x2 = int(left_lines[:, 2].mean())
+    right_x2 = int(right_lines[:, 2].mean())
     lane_center = (left_x2 + right_x2) // 2
-    frame_center = FRAME_WIDTH // 2
-    deviation = lane_center - frame_center
+    frame_center = PROC_WIDTH // 2
+    deviation = (lane_center - frame_center) * PROC_SCALE
 
     if abs(deviation) <= CENTER_TOLERANCE:
         lane_state = "centered"
@@ -141,67 +184,92 @@ def detect_lanes(frame_rgb):
 
 # -------------------- STATE FOR VIOLATIONS --------------------
 ema_dev = 0.0
-left_persist = 0
-right_persist = 0
-last_violation_ts = 0.0
+# [left_persist, right_persist, last_violation_ts], updated in place by check_violation
+violation_state = np.zeros(3, dtype=np.float64)
+VIOLATIONS = ("", "unsignaled_left_deviation", "unsignaled_right_deviation")
 
 
+@njit(cache=True)
 def update_ema(current, previous, alpha):
     return alpha * current + (1.0 - alpha) * previous
 
 
+# Keep-alive session and queue so the lane loop never waits on HTTP
+_session = requests.Session()
+_session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+_event_queue = queue.Queue(maxsize=64)
+
+
+def _event_worker():
+    """Post queued events to the SSE server in the background."""
+    while True:
+        event_data = _event_queue.get()
+        try:
+            _session.post(SERVER_URL, json=event_data, timeout=0.5)
+        except Exception:
+            # Silently fail if server is not running
+            pass
+
+
+threading.Thread(target=_event_worker, daemon=True).start()
+
+
 def emit_event(event_data):
     """
-    Send event to the SSE server.
-    Fails silently if server is unavailable to not crash the detection module.
+    Queue event for the SSE server.
+    Drops the event if the queue is full to not stall the detection module.
     """
     if not EMIT_EVENTS:
         return
 
     try:
-        requests.post(SERVER_URL, json=event_data, timeout=0.1)
-    except Exception:
-        # Silently fail if server is not running
+        _event_queue.put_nowait(event_data)
+    except queue.Full:
         pass
 
 
-def check_violation(ema_deviation, bl_left, bl_right, now):
-    global left_persist, right_persist, last_violation_ts
-    violation = ""
+@njit(cache=True)
+def _check_violation_nb(ema_deviation, bl_left, bl_right, now, state):
+    """Returns an index into VIOLATIONS: 0 none, 1 left, 2 right."""
+    violation = 0
 
     # Determine drift beyond tolerance + margin
     if ema_deviation < -(CENTER_TOLERANCE + DRIFT_MARGIN):
-        left_persist += 1
-        right_persist = 0
-        if left_persist >= PERSIST_FRAMES:
-            if not bl_left and (now - last_violation_ts) > VIOLATION_COOLDOWN_S:
-                violation = "unsignaled_left_deviation"
-                left_persist = 0
-                last_violation_ts = now
+        state[0] += 1
+        state[1] = 0
+        if state[0] >= PERSIST_FRAMES:
+            if not bl_left and (now - state[2]) > VIOLATION_COOLDOWN_S:
+                violation = 1
+                state[0] = 0
+                state[2] = now
     elif ema_deviation > (CENTER_TOLERANCE + DRIFT_MARGIN):
-        right_persist += 1
-        left_persist = 0
-        if right_persist >= PERSIST_FRAMES:
-            if not bl_right and (now - last_violation_ts) > VIOLATION_COOLDOWN_S:
-                violation = "unsignaled_right_deviation"
-                right_persist = 0
-                last_violation_ts = now
+        state[1] += 1
+        state[0] = 0
+        if state[1] >= PERSIST_FRAMES:
+            if not bl_right and (now - state[2]) > VIOLATION_COOLDOWN_S:
+                violation = 2
+                state[1] = 0
+                state[2] = now
     else:
         # Back near center; decay counters
-        left_persist = max(0, left_persist - 1)
-        right_persist = max(0, right_persist - 1)
+        state[0] = max(0.0, state[0] - 1)
+        state[1] = max(0.0, state[1] - 1)
 
     return violation
 
 
+def check_violation(ema_deviation, bl_left, bl_right, now):
+    return VIOLATIONS[_check_violation_nb(ema_deviation, bl_left, bl_right, now, violation_state)]
+
+
 # -------------------- SYNTHETIC SELF-TEST --------------------
-def make_synthetic_frame(drift_px=0):
-    """Create a simple synthetic road image with two lane lines.
-    drift_px shifts the lane center to simulate deviation.
-    Returns an RGB frame.
-    """
+_synthetic_base = None
+
+
+def _draw_synthetic_base():
+    """Draw the centered two-lane road the synthetic frames are shifted from."""
     img = np.zeros((FRAME_HEIGHT, FRAME_WIDTH, 3), dtype=np.uint8)
-    center_x = FRAME_WIDTH // 2 + int(drift_px)
+    center_x = FRAME_WIDTH // 2
     lane_half = 120
     thickness = 6
     color = (255, 255, 255)
@@ -218,6 +286,18 @@ def make_synthetic_frame(drift_px=0):
     return img
 
 
+def make_synthetic_frame(drift_px=0):
+    """Create a simple synthetic road image with two lane lines.
+    drift_px shifts the lane center to simulate deviation.
+    Returns an RGB frame.
+    """
+    global _synthetic_base
+    if _synthetic_base is None:
+        _synthetic_base = _draw_synthetic_base()
+    # Lane lines stay clear of the edges for the tested drifts, so the wrap-around is blank
+    return np.roll(_synthetic_base, int(drift_px), axis=1)
+
+
 def run_synthetic_test(num_cases=3):
     print("Running synthetic self-test...")
     tests = [0, -70, 70][:max(1, num_cases)]
@@ -236,39 +316,43 @@ def main():
     parser.add_argument("--device-id", type=int, default=0, help="OpenCV camera device id")
     parser.add_argument("--sleep", type=float, default=0.1, help="Sleep between frames (s)")
     parser.add_argument("--synthetic-test", type=int, default=0, help="Run N synthetic tests then exit")
+    parser.add_argument("--verbose", action="store_true", help="Print per-frame lane state")
     args = parser.parse_args()
 
     if args.synthetic_test > 0:
         run_synthetic_test(args.synthetic_test)
         return
 
-    # CSV init
+    # CSV init: one handle and writer for the whole run
     csv_path = args.csv
     fresh_file = not os.path.exists(csv_path)
-    with open(csv_path, mode="a", newline="") as file:
-        writer = csv.writer(file)
-        if fresh_file:
-            writer.writerow([
-                "Timestamp",
-                "LaneState",
-                "Deviation(px)",
-                "EMA_Deviation(px)",
-                "BlinkerLeft",
-                "BlinkerRight",
-                "Violation"
-            ])
+    csv_file = open(csv_path, mode="a", newline="")
+    writer = csv.writer(csv_file)
+    if fresh_file:
+        writer.writerow([
+            "Timestamp",
+            "LaneState",
+            "Deviation(px)",
+            "EMA_Deviation(px)",
+            "BlinkerLeft",
+            "BlinkerRight",
+            "Violation"
+        ])
+    rows_logged = 0
 
     print("🟢 Lane detection with unsignaled deviation started... Ctrl+C to stop.\n")
 
     cap = None
     picam2 = None
     using_picam2 = PICAMERA2_AVAILABLE and not args.force_opencv
+    # Picamera2 delivers YUV420 whose Y plane is already grayscale, VideoCapture delivers BGR
+    gray_code = None if using_picam2 else cv2.COLOR_BGR2GRAY
 
     try:
         if using_picam2:
             picam2 = Picamera2()
             picam2.preview_configuration.main.size = (FRAME_WIDTH, FRAME_HEIGHT)
-            picam2.preview_configuration.main.format = "RGB888"
+            picam2.preview_configuration.main.format = "YUV420"
             picam2.configure("preview")
             picam2.start()
         else:
@@ -279,26 +363,44 @@ def main():
         global ema_dev
         ema_dev = 0.0
 
+        # Bind per-frame globals and attributes to locals once; the loop then
+        # uses fast local loads instead of module dict lookups
+        _now = time.time
+        _sleep = time.sleep
+        _detect = detect_lanes
+        _update_ema = update_ema
+        _check = check_violation
+        _blinker_left = blinker_left_on
+        _blinker_right = blinker_right_on
+        _writerow = writer.writerow
+        _flush = csv_file.flush
+        _capture = picam2.capture_array if using_picam2 else cap.read
+        _EMA = EMA_ALPHA
+        _FLUSH_EVERY = CSV_FLUSH_EVERY
+        _H, _W = FRAME_HEIGHT, FRAME_WIDTH
+        verbose = args.verbose
+        frame_sleep = args.sleep
+
         while True:
             if using_picam2:
-                frame_rgb = picam2.capture_array()  # RGB
+                # YUV420 is planar with the full-resolution Y plane first
+                frame = _capture()[:_H, :_W]
             else:
-                ret, frame_bgr = cap.read()
+                ret, frame = _capture()  # BGR
                 if not ret:
                     continue
-                frame_rgb = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
 
-            _, deviation, lane_state = detect_lanes(frame_rgb)
+            _, deviation, lane_state = _detect(frame, gray_code)
 
             # Smooth deviation for stability
-            ema_dev = update_ema(deviation, ema_dev, EMA_ALPHA)
+            ema_dev = _update_ema(deviation, ema_dev, _EMA)
 
             # Read blinkers
-            bl_left = blinker_left_on()
-            bl_right = blinker_right_on()
+            bl_left = _blinker_left()
+            bl_right = _blinker_right()
 
-            now = time.time()
-            violation = check_violation(ema_dev, bl_left, bl_right, now)
+            now = _now()
+            violation = _check(ema_dev, bl_left, bl_right, now)
             if violation:
                 print(f"⚠️  {violation.replace('_',' ').title()} | EMA deviation: {ema_dev:.1f}px")
                 buzz(120)
@@ -325,17 +427,21 @@ def main():
                 }
                 emit_event(event_data)
 
-            ts = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            print(f"[{ts}] State: {lane_state:18s} dev: {deviation:6.1f}px ema: {ema_dev:6.1f}px "
-                  f"BL:{int(bl_left)} BR:{int(bl_right)} {'| ' + violation if violation else ''}")
+            if verbose:
+                ts = datetime.datetime.fromtimestamp(now).strftime("%Y-%m-%d %H:%M:%S")
+                print(f"[{ts}] State: {lane_state:18s} dev: {deviation:6.1f}px ema: {ema_dev:6.1f}px "
+                      f"BL:{int(bl_left)} BR:{int(bl_right)} {'| ' + violation if violation else ''}")
 
-            with open(csv_path, mode="a", newline="") as file:
-                csv.writer(file).writerow([
-                    ts, lane_state, round(deviation, 2), round(ema_dev, 2),
-                    int(bl_left), int(bl_right), violation
-                ])
+            # Unix time in seconds; convert to local time offline when needed
+            _writerow([
+                f"{now:.3f}", lane_state, round(deviation, 2), round(ema_dev, 2),
+                int(bl_left), int(bl_right), violation
+            ])
+            rows_logged += 1
+            if rows_logged % _FLUSH_EVERY == 0:
+                _flush()
 
-            time.sleep(args.sleep)  # adjust to your target FPS
+            _sleep(frame_sleep)  # adjust to your target FPS
 
     except KeyboardInterrupt:
         print("\n🛑 Stopped by user.")
@@ -355,6 +461,7 @@ def main():
                 GPIO.cleanup()
             except Exception:
                 pass
+        csv_file.close()
         print(f"✅ Log saved to {csv_path}")
 
 
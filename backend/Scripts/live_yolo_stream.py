@@ -1,7 +1,11 @@
 import cv2
+import os
 import sys
 import time
+import argparse
+import threading
 import numpy as np
+from queue import Queue, Empty, Full
 
 # --- YOLO/Ultralytics Import ---
 try:
@@ -16,6 +20,14 @@ try:
     PICAMERA2_AVAILABLE = True
 except Exception:
     PICAMERA2_AVAILABLE = False
+
+# --- Hailo AI Hat Import-Safety (HailoRT on RPi 5) ---
+try:
+    from hailo_platform import (HEF, VDevice, ConfigureParams, HailoStreamInterface,    # type: ignore
+                                InferVStreams, InputVStreamParams, OutputVStreamParams, FormatType)
+    HAILO_AVAILABLE = True
+except Exception:
+    HAILO_AVAILABLE = False
     
 # --- Configuration ---
 # 🛑 CRITICAL: Update this path to your model location 🛑
@@ -25,12 +37,108 @@ CONFIDENCE_THRESHOLD = 0.5 # Same as 'conf=0.5' in your prediction script
 FRAME_WIDTH = 640
 FRAME_HEIGHT = 480
 
+# NCNN export of the checkpoint (written by --export-ncnn next to the .pt);
+# used instead of the PyTorch weights when present since it runs much faster on the Pi CPU
+NCNN_MODEL_PATH = os.path.splitext(MODEL_PATH)[0] + '_ncnn_model'
+
+# Hailo-8L build of the model (compiled from an ONNX export with the Hailo
+# Dataflow Compiler, with NMS on-chip); preferred over the CPU models when present
+HEF_PATH = os.path.splitext(MODEL_PATH)[0] + '.hef'
+CLASS_NAMES = None # Optional list of labels for HEF detections; class ids are shown otherwise
+
+class HailoInference:
+    """Runs a compiled YOLO HEF on the Hailo accelerator and draws its detections."""
+
+    def __init__(self, hef_path):
+        self.hef = HEF(hef_path)
+        self.device = VDevice()
+        configure_params = ConfigureParams.create_from_hef(self.hef, interface=HailoStreamInterface.PCIe)
+        self.network_group = self.device.configure(self.hef, configure_params)[0]
+
+        input_info = self.hef.get_input_vstream_infos()[0]
+        self.input_name = input_info.name
+        self.input_height, self.input_width = input_info.shape[:2]
+        # Input buffer reused every frame; the frame is resized straight into it
+        self.input_buffer = np.empty((1, self.input_height, self.input_width, 3), dtype=np.uint8)
+
+        input_params = InputVStreamParams.make(self.network_group, format_type=FormatType.UINT8)
+        output_params = OutputVStreamParams.make(self.network_group, format_type=FormatType.FLOAT32)
+        self._activation = self.network_group.activate(self.network_group.create_params())
+        self._activation.__enter__()
+        self._pipeline = InferVStreams(self.network_group, input_params, output_params)
+        self._pipeline.__enter__()
+
+    def annotate(self, frame, conf):
+        """Run one frame through the accelerator and return a copy with boxes drawn."""
+        image = frame[:, :, :3] # Picamera2 frames may carry an alpha channel
+        cv2.resize(image, (self.input_width, self.input_height), dst=self.input_buffer[0])
+        if not PICAMERA2_AVAILABLE:
+            # OpenCV frames are BGR; Picamera2's XBGR8888 is already RGB in memory
+            cv2.cvtColor(self.input_buffer[0], cv2.COLOR_BGR2RGB, dst=self.input_buffer[0])
+        outputs = self._pipeline.infer({self.input_name: self.input_buffer})
+
+        # On-chip NMS output: per class, rows of normalized (ymin, xmin, ymax, xmax, score)
+        per_class = next(iter(outputs.values()))[0]
+        annotated = image.copy() # boxes are drawn on a copy, not the captured frame
+        height, width = annotated.shape[:2]
+        for class_id, detections in enumerate(per_class):
+            for ymin, xmin, ymax, xmax, score in detections:
+                if score < conf:
+                    continue
+                p1 = (int(xmin * width), int(ymin * height))
+                p2 = (int(xmax * width), int(ymax * height))
+                label = CLASS_NAMES[class_id] if CLASS_NAMES else str(class_id)
+                cv2.rectangle(annotated, p1, p2, (0, 255, 0), 2)
+                cv2.putText(annotated, f"{label} {score:.2f}", (p1[0], max(p1[1] - 5, 10)),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 1)
+        return annotated
+
+    def close(self):
+        self._pipeline.__exit__(None, None, None)
+        self._activation.__exit__(None, None, None)
+        self.device.release()
+
+def export_ncnn_model():
+    """One-time export of the PyTorch checkpoint to an FP16 NCNN model."""
+    print(f"Exporting {MODEL_PATH} to NCNN...")
+    YOLO(MODEL_PATH).export(format='ncnn', imgsz=FRAME_WIDTH, half=True)
+    print(f"NCNN model saved to: {NCNN_MODEL_PATH}")
+
+def capture_frames(camera, frames, stop):
+    """Producer: keep the newest frame in the 1-slot queue, dropping stale ones."""
+    while not stop.is_set():
+        if PICAMERA2_AVAILABLE:
+            frame = camera.capture_array()
+        else:
+            ret, frame = camera.read()
+            if not ret:
+                print("Error reading frame or end of stream.")
+                stop.set()
+                break
+        
+        if frames.full():
+            try:
+                frames.get_nowait()
+            except Empty:
+                pass
+        try:
+            frames.put_nowait(frame)
+        except Full:
+            pass
+
 def run_live_detection():
     camera = None
+    hailo = None
     try:
-        # Load the YOLO Model
-        print(f"Loading model from: {MODEL_PATH} on device: {DEVICE}")
-        model = YOLO(MODEL_PATH)
+        if HAILO_AVAILABLE and os.path.exists(HEF_PATH):
+            # Offload inference to the Hailo AI Hat
+            print(f"Loading model from: {HEF_PATH} on device: Hailo")
+            hailo = HailoInference(HEF_PATH)
+        else:
+            # Load the YOLO Model, preferring the NCNN export
+            model_path = NCNN_MODEL_PATH if os.path.isdir(NCNN_MODEL_PATH) else MODEL_PATH
+            print(f"Loading model from: {model_path} on device: {DEVICE}")
+            model = YOLO(model_path, task='detect')
         
         # Initialize Camera
         if PICAMERA2_AVAILABLE:
@@ -52,36 +160,36 @@ def run_live_detection():
         print(f"❌ Initialization Error: {e}")
         return
 
+    # --- Capture Thread ---
+    # Frames are grabbed on a separate thread so the camera keeps streaming
+    # while inference runs; only the newest frame is kept
+    frames = Queue(maxsize=1)
+    stop = threading.Event()
+    producer = threading.Thread(target=capture_frames, args=(camera, frames, stop), daemon=True)
+    producer.start()
+
     # --- Main Detection Loop ---
     print("\nStarting live detection stream. Press 'q' to quit...")
-    while True:
+    while not stop.is_set():
         try:
-            # 1. Capture Frame
-            if PICAMERA2_AVAILABLE:
-                frame = camera.capture_array()
-            else:
-                ret, frame = camera.read()
-                if not ret:
-                    print("Error reading frame or end of stream.")
-                    break
-            
-            # 2. Run Inference
-            # The 'stream=True' and 'verbose=False' ensure efficient, quiet, real-time processing
-            results = model.predict(
-                source=frame,
-                conf=CONFIDENCE_THRESHOLD,
-                device=DEVICE,
-                stream=True, 
-                verbose=False
-            )
+            # 1. Take the newest captured frame
+            try:
+                frame = frames.get(timeout=1.0)
+            except Empty:
+                continue
             
-            # 3. Process and Display the first result (most common case for a single frame)
-            for result in results:
-                # result.plot() handles drawing the bounding boxes and labels
-                annotated_frame = result.plot() 
+            # 2. Run Inference and 3. Process the result
+            if hailo is not None:
+                annotated_frame = hailo.annotate(frame, CONFIDENCE_THRESHOLD)
+            else:
+                # A direct call on a single frame returns a one-element list; 'verbose=False' keeps it quiet
+                results = model(frame, conf=CONFIDENCE_THRESHOLD, device=DEVICE, verbose=False)
                 
-                # Display the frame
-                cv2.imshow("YOLO Live Detection Stream", annotated_frame)
+                # result.plot() handles drawing the bounding boxes and labels
+                annotated_frame = results[0].plot()
+            
+            # Display the frame
+            cv2.imshow("YOLO Live Detection Stream", annotated_frame)
             
             # Check for 'q' key press (1ms delay)
             if cv2.waitKey(1) & 0xFF == ord('q'):
@@ -93,6 +201,10 @@ def run_live_detection():
             break
 
     # --- 4. Cleanup ---
+    stop.set()
+    producer.join(timeout=2.0)
+    if hailo is not None:
+        hailo.close()
     if camera:
         if PICAMERA2_AVAILABLE:
             camera.stop()
@@ -102,4 +214,12 @@ def run_live_detection():
     print("Stream closed.")
 
 if __name__ == "__main__":
-    run_live_detection()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Live YOLO detection stream")
+    parser.add_argument("--export-ncnn", action="store_true",
+                        help="Export MODEL_PATH to NCNN for faster CPU inference, then exit")
+    args = parser.parse_args()
+
+    if args.export_ncnn:
+        export_ncnn_model()
+    else:
+        run_live_detection()
\ No newline at end of file
@@ -11,7 +11,7 @@ Key Features:
 - High-precision timestamping for temporal analysis
 - Configurable sampling rates and output directories
 - Graceful shutdown handling with signal management
-- CSV output format compatible with analysis tools
+- Buffered binary output (or CSV for compatibility with analysis tools)
 - Real-time data validation and error handling
 
 Hardware Requirements:
@@ -28,6 +28,9 @@ Usage Examples:
     
     # Specific I2C bus and address
     python mpu6050_data_logger.py --bus 1 --address 0x68
+    
+    # CSV output instead of the binary log
+    python mpu6050_data_logger.py --format csv
 
 Author: Driver Behavior Analysis System
 Version: 1.0
@@ -38,6 +41,7 @@ import time          # For timing control and sleep operations
 import csv          # For CSV file writing and data formatting
 import datetime     # For timestamp generation and date handling
 import signal       # For graceful shutdown signal handling
+import struct       # For unpacking burst-read sensor registers
 import sys          # For system-specific parameters and functions
 from pathlib import Path  # For cross-platform path handling
 import argparse     # For command-line argument parsing
@@ -90,6 +94,10 @@ class MPU6050:
     GYRO_YOUT_H = 0x45
     GYRO_ZOUT_H = 0x47
     
+    # Burst read layout from ACCEL_XOUT_H: accel x/y/z, temperature, gyro x/y/z
+    # as big-endian signed 16-bit words
+    _BURST = struct.Struct('>hhhhhhh')
+    
     def __init__(self, bus=1, address=0x68):
         """
         Initialize MPU6050 sensor.
@@ -161,59 +169,90 @@ class MPU6050:
     
     def get_all_data(self):
         """Get both accelerometer and gyroscope data."""
-        accel = self.get_accel_data()
-        gyro = self.get_gyro_data()
-        
-        if accel is None or gyro is None:
+        if not self.initialized:
             return None
+        
+        # Read accel, temperature and gyro registers (0x3B-0x48) in one I2C
+        # transaction; the MPU6050 auto-increments the register address
+        raw = self.bus.read_i2c_block_data(self.address, self.ACCEL_XOUT_H, 14)
+        ax, ay, az, _temp, gx, gy, gz = self._BURST.unpack(bytes(raw))
             
         return {
-            'accel_x': accel[0],
-            'accel_y': accel[1], 
-            'accel_z': accel[2],
-            'gyro_x': gyro[0],
-            'gyro_y': gyro[1],
-            'gyro_z': gyro[2]
+            'accel_x': ax / 16384.0,
+            'accel_y': ay / 16384.0, 
+            'accel_z': az / 16384.0,
+            'gyro_x': gx / 131.0,
+            'gyro_y': gy / 131.0,
+            'gyro_z': gz / 131.0
         }
 
+# Record layout of binary logs; read back with load_binary_log()
+LOG_FIELDS = [
+    'timestamp', 'sample_number', 
+    'accel_x', 'accel_y', 'accel_z',
+    'gyro_x', 'gyro_y', 'gyro_z',
+    'accel_magnitude', 'gyro_magnitude'
+]
+LOG_DTYPE = np.dtype(
+    [('timestamp', 'datetime64[us]'), ('sample_number', np.int64)] +
+    [(name, np.float32) for name in LOG_FIELDS[2:]]
+)
+
+def load_binary_log(path):
+    """Load a binary MPU6050 log as a NumPy structured array with LOG_FIELDS."""
+    return np.fromfile(path, dtype=LOG_DTYPE)
+
 class DataLogger:
     """
     Data logger for MPU6050 sensor data.
+    
+    Samples are buffered column-wise in NumPy arrays and written out once per
+    second of data, either as LOG_DTYPE records appended to a .bin file or as
+    CSV rows.
     """
     
-    def __init__(self, output_dir="logs", sample_rate=50):
+    def __init__(self, output_dir="logs", sample_rate=50, output_format="binary"):
         """
         Initialize data logger.
         
         Args:
             output_dir (str): Directory to save log files
             sample_rate (int): Sampling rate in Hz
+            output_format (str): 'binary' for a LOG_DTYPE record file, 'csv' for CSV
         """
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
         self.sample_rate = sample_rate
         self.sample_interval = 1.0 / sample_rate
+        self.output_format = output_format
         self.running = False
-        self.csv_file = None
+        self.log_file = None
         self.csv_writer = None
         self.sample_count = 0
         
+        # One second of samples: accel x/y/z and gyro x/y/z per row, plus timestamps.
+        # float32 like LOG_DTYPE so binary writes need no downcast; CSV keeps
+        # float64 so its text has the readings' full digits, not float32 noise
+        buf_dtype = np.float64 if output_format == "csv" else np.float32
+        self._buf = np.empty((sample_rate, 6), dtype=buf_dtype)
+        self._ts = np.empty(sample_rate, dtype='datetime64[us]')
+        self._i = 0  # rows currently buffered
+        self._last_flush = time.monotonic()
+        
         # Create filename with timestamp
         timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        self.filename = self.output_dir / f"mpu6050_data_{timestamp}.csv"
+        extension = "csv" if output_format == "csv" else "bin"
+        self.filename = self.output_dir / f"mpu6050_data_{timestamp}.{extension}"
         
     def start_logging(self):
-        """Start data logging to CSV file."""
+        """Start data logging to the log file."""
         try:
-            self.csv_file = open(self.filename, 'w', newline='')
-            fieldnames = [
-                'timestamp', 'sample_number', 
-                'accel_x', 'accel_y', 'accel_z',
-                'gyro_x', 'gyro_y', 'gyro_z',
-                'accel_magnitude', 'gyro_magnitude'
-            ]
-            self.csv_writer = csv.DictWriter(self.csv_file, fieldnames=fieldnames)
-            self.csv_writer.writeheader()
+            if self.output_format == "csv":
+                self.log_file = open(self.filename, 'w', newline='')
+                self.csv_writer = csv.writer(self.log_file)
+                self.csv_writer.writerow(LOG_FIELDS)
+            else:
+                self.log_file = open(self.filename, 'wb')
             self.running = True
             print(f"Started logging to {self.filename}")
             print("Press Ctrl+C to stop logging")
@@ -224,55 +263,74 @@ class DataLogger:
     
     def log_data(self, sensor_data):
         """
-        Log sensor data to CSV.
+        Buffer one sample for the log file.
+        
+        Samples are held in a one-second array and written as a single batch
+        (binary records or CSV rows, per output_format) when it fills, or
+        once a second has passed since the last write.
         
         Args:
             sensor_data (dict): Sensor data from MPU6050
         """
-        if not self.running or self.csv_writer is None:
+        if not self.running or self.log_file is None:
             return
             
         try:
-            timestamp = datetime.datetime.now().isoformat()
             self.sample_count += 1
             
-            # Calculate magnitudes
-            accel_magnitude = np.sqrt(
-                sensor_data['accel_x']**2 + 
-                sensor_data['accel_y']**2 + 
-                sensor_data['accel_z']**2
-            )
-            gyro_magnitude = np.sqrt(
-                sensor_data['gyro_x']**2 + 
-                sensor_data['gyro_y']**2 + 
-                sensor_data['gyro_z']**2
+            # Buffer the sample; magnitudes are computed per batch on write
+            i = self._i
+            self._ts[i] = datetime.datetime.now()
+            self._buf[i] = (
+                sensor_data['accel_x'], sensor_data['accel_y'], sensor_data['accel_z'],
+                sensor_data['gyro_x'], sensor_data['gyro_y'], sensor_data['gyro_z']
             )
+            self._i = i + 1
             
-            # Write data to CSV
-            row = {
-                'timestamp': timestamp,
-                'sample_number': self.sample_count,
-                'accel_x': sensor_data['accel_x'],
-                'accel_y': sensor_data['accel_y'],
-                'accel_z': sensor_data['accel_z'],
-                'gyro_x': sensor_data['gyro_x'],
-                'gyro_y': sensor_data['gyro_y'],
-                'gyro_z': sensor_data['gyro_z'],
-                'accel_magnitude': accel_magnitude,
-                'gyro_magnitude': gyro_magnitude
-            }
-            
-            self.csv_writer.writerow(row)
-            self.csv_file.flush()  # Ensure data is written immediately
+            # Write when the buffer fills, or after a second if sampling runs slow
+            if self._i == len(self._buf) or time.monotonic() - self._last_flush > 1.0:
+                self._write_buffer()
             
         except Exception as e:
             print(f"Error logging data: {e}")
     
+    def _write_buffer(self):
+        """Write the buffered samples to the log file in one batch."""
+        n = self._i
+        if n == 0:
+            return
+        
+        data = self._buf[:n]
+        accel_magnitude = np.sqrt((data[:, :3] ** 2).sum(axis=1))
+        gyro_magnitude = np.sqrt((data[:, 3:] ** 2).sum(axis=1))
+        sample_numbers = np.arange(self.sample_count - n + 1, self.sample_count + 1)
+        
+        if self.output_format == "csv":
+            timestamps = np.datetime_as_string(self._ts[:n], unit='us')
+            self.csv_writer.writerows(zip(
+                timestamps, sample_numbers.tolist(), *data.T.tolist(),
+                accel_magnitude.tolist(), gyro_magnitude.tolist()
+            ))
+        else:
+            records = np.empty(n, dtype=LOG_DTYPE)
+            records['timestamp'] = self._ts[:n]
+            records['sample_number'] = sample_numbers
+            for col, name in enumerate(LOG_FIELDS[2:8]):
+                records[name] = data[:, col]
+            records['accel_magnitude'] = accel_magnitude
+            records['gyro_magnitude'] = gyro_magnitude
+            records.tofile(self.log_file)
+        
+        self.log_file.flush()
+        self._last_flush = time.monotonic()
+        self._i = 0
+    
     def stop_logging(self):
         """Stop data logging and close file."""
         self.running = False
-        if self.csv_file:
-            self.csv_file.close()
+        if self.log_file and not self.log_file.closed:
+            self._write_buffer()
+            self.log_file.close()
             print(f"Stopped logging. Total samples: {self.sample_count}")
             print(f"Data saved to: {self.filename}")
 
@@ -295,6 +353,8 @@ def main():
                        help='I2C bus number (default: 1)')
     parser.add_argument('--address', default='0x68',
                        help='I2C address (default: 0x68)')
+    parser.add_argument('--format', choices=['binary', 'csv'], default='binary',
+                       help='Log file format (default: binary)')
     
     args = parser.parse_args()
     
@@ -311,7 +371,8 @@ def main():
         return
     
     # Initialize data logger
-    logger = DataLogger(output_dir=args.output_dir, sample_rate=args.sample_rate)
+    logger = DataLogger(output_dir=args.output_dir, sample_rate=args.sample_rate,
+                        output_format=args.format)
     
     # Set up signal handler for graceful shutdown
     signal.signal(signal.SIGINT, signal_handler)
@@ -323,10 +384,12 @@ def main():
         print("Failed to start logging. Exiting.")
         return
     
-    # Main logging loop
+    # Main logging loop, scheduled against absolute deadlines on the
+    # high-resolution clock so sleep overshoot does not accumulate
+    period_ns = int(1e9 / logger.sample_rate)
+    next_deadline = time.perf_counter_ns()
     try:
         while logger.running:
-            start_time = time.time()
             
             # Read sensor data
             sensor_data = mpu.get_all_data()
@@ -337,10 +400,14 @@ def main():
                 if logger.sample_count % 100 == 0:
                     print(f"Logged {logger.sample_count} samples...")
             
-            # Maintain sample rate
-            elapsed = time.time() - start_time
-            sleep_time = max(0, logger.sample_interval - elapsed)
-            time.sleep(sleep_time)
+            # Maintain sample rate: sleep until just before the deadline,
+            # then spin for the remaining tail
+            next_deadline += period_ns
+            dt = next_deadline - time.perf_counter_ns()
+            if dt > 200_000:
+                time.sleep(dt / 1e9 - 0.0001)
+            while time.perf_counter_ns() < next_deadline:
+                pass
             
     except KeyboardInterrupt:
         pass
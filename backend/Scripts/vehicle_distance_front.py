@@ -10,9 +10,12 @@ in the central ROI and prints a rough distance estimate.
 Based on concepts from: https://github.com/kemalkilicaslan/Vehicle-Distance-Measurement-System
 """
 
+import os
 import time
+import threading
+from queue import Queue, Empty, Full
 from pathlib import Path
-from typing import Tuple, Dict, List
+from typing import Tuple, Dict
 
 import numpy as np
 import cv2
@@ -22,9 +25,11 @@ try:
 except Exception:
     ov = None
 try:
-    import hailo  # placeholder for Hailo SDK presence check
+    from hailo_platform import (HEF, VDevice, ConfigureParams, HailoStreamInterface,  # type: ignore
+                                InferVStreams, InputVStreamParams, OutputVStreamParams, FormatType)
+    HAILO_AVAILABLE = True
 except Exception:
-    hailo = None
+    HAILO_AVAILABLE = False
 
 
 # ========= Configuration =========
@@ -37,11 +42,28 @@ DISPLAY = True
 # YOLO model (downloads on first use)
 YOLO_MODEL = 'yolov8n.pt'  # lightweight; change to yolov8s.pt for better accuracy
 VEHICLE_CLASS_IDS = {2, 3, 5, 7}  # COCO: car=2, motorcycle=3, bus=5, truck=7
+VEHICLE_CLASS_NAMES = {2: 'car', 3: 'motorcycle', 5: 'bus', 7: 'truck'}
 DETECTION_CONFIDENCE = 0.35
+# Detector input (h, w); frames are downscaled to this and boxes scaled back,
+# the display stays at the capture resolution
+DETECTOR_IMGSZ = (384, 640)
+NMS_IOU = 0.7  # Ultralytics default, used by the raw OpenVINO path
 
 # Simple central ROI polygon (fractional coordinates of frame)
 ROI_FRAC = np.array([[0.35, 0.55], [0.65, 0.55], [0.85, 1.0], [0.15, 1.0]], dtype=np.float32)
 
+# Motion gate: frames whose 64x36 gray thumbnail differs from the last
+# inferred one by less than MOTION_SAD_PER_PX (mean abs diff) reuse its
+# result; inference still runs at least every MOTION_MAX_REUSE_S
+MOTION_GATE = True
+MOTION_THUMB_SIZE = (64, 36)
+MOTION_SAD_PER_PX = 2.0
+MOTION_MAX_REUSE_S = 0.15
+
+# ROI tint: 0.88 * frame + 0.12 * green in 8-bit fixed point (225/256, 31/256)
+ROI_KEEP = 225
+ROI_TINT = np.array([0, 255 * 31, 0], dtype=np.uint16)
+
 # Distance estimation parameters
 FOCAL_LENGTH_PX = 900.0   # pixels; requires calibration for your camera
 REF_HEIGHTS_M = {         # nominal real heights per class (rough values)
@@ -51,6 +73,244 @@ REF_HEIGHTS_M = {         # nominal real heights per class (rough values)
     7: 2.50,  # truck
 }
 PERSPECTIVE_ALPHA = 0.0005  # small correction for off-center targets
+VEHICLE_CLASS_ARRAY = np.fromiter(sorted(VEHICLE_CLASS_IDS), dtype=np.int32)
+# FOCAL_LENGTH_PX * REF_HEIGHTS_M as a float32 lookup table indexed by class id
+# (1.55 m for unlisted classes; ids past the end clip to an unlisted entry)
+FH_LUT = np.full(max(80, max(REF_HEIGHTS_M) + 2), FOCAL_LENGTH_PX * 1.55, dtype=np.float32)
+FH_LUT[list(REF_HEIGHTS_M)] = [FOCAL_LENGTH_PX * h for h in REF_HEIGHTS_M.values()]
+
+# OpenVINO compiled-blob cache (CACHE_DIR on ov.Core), reused across runs by
+# OpenVINODetector; the Ultralytics fallback without openvino has no cache
+OV_CACHE_DIR = './.ov_cache'
+
+# Capture: at most this many queued frames are skipped per loop; a grab that
+# returns faster than GRAB_BUFFERED_S came from the driver queue (stale)
+MAX_DRAIN_GRABS = 4
+GRAB_BUFFERED_S = 0.005
+# GStreamer capture presets for --gst: MJPEG is decoded by the hardware JPEG
+# decoder (Pi V4L2 M2M, Jetson NVDEC) instead of on the CPU, and appsink keeps
+# at most one frame, dropping the rest
+GST_PIPELINES = {
+    'pi': ('v4l2src device=/dev/video{camera} ! image/jpeg,width={width},height={height},framerate=30/1 ! '
+           'v4l2jpegdec ! videoconvert ! video/x-raw,format=BGR ! appsink max-buffers=1 drop=true sync=false'),
+    'jetson': ('v4l2src device=/dev/video{camera} ! image/jpeg,width={width},height={height},framerate=30/1 ! '
+               'nvv4l2decoder mjpeg=1 ! nvvidconv ! video/x-raw,format=BGRx ! videoconvert ! '
+               'video/x-raw,format=BGR ! appsink max-buffers=1 drop=true sync=false'),
+}
+
+
+def grab_latest(cap: cv2.VideoCapture) -> Tuple[bool, np.ndarray]:
+    """Skip frames queued while the detector ran and decode only the newest one."""
+    for _ in range(MAX_DRAIN_GRABS):
+        t0 = time.perf_counter()
+        if not cap.grab():
+            return False, None
+        if time.perf_counter() - t0 > GRAB_BUFFERED_S:
+            break  # waited on the camera, so this frame is fresh
+    return cap.retrieve()
+
+
+def capture_frames(cap: cv2.VideoCapture, frames: Queue, stop: threading.Event) -> None:
+    """Producer: keep the newest frame in the 1-slot queue, dropping stale ones."""
+    while not stop.is_set():
+        ok, frame = grab_latest(cap)
+        if not ok:
+            time.sleep(0.02)
+            continue
+        if frames.full():
+            try:
+                frames.get_nowait()
+            except Empty:
+                pass
+        try:
+            frames.put_nowait(frame)
+        except Full:
+            pass
+
+
+def cpu_has_vnni() -> bool:
+    """True if the CPU has AVX-512 VNNI / AVX-VNNI int8 dot-product instructions."""
+    try:
+        import cpuinfo  # py-cpuinfo, optional
+        flags = set(cpuinfo.get_cpu_info().get('flags', []))
+    except Exception:
+        try:
+            with open('/proc/cpuinfo') as f:
+                flags = set(next((line for line in f if line.startswith('flags')), '').split())
+        except OSError:
+            flags = set()
+    return 'avx512_vnni' in flags or 'avx_vnni' in flags
+
+
+class OpenVINODetector:
+    """Runs an exported YOLO OpenVINO model directly on the OpenVINO runtime."""
+
+    def __init__(self, model_dir: str, conf: float, num_requests: int = 1):
+        model_dir = Path(model_dir)
+        core = ov.Core()
+        # Compiled blobs are cached so later starts skip the (multi-second) compile
+        core.set_property({'CACHE_DIR': OV_CACHE_DIR})
+        # One camera, one request in flight: LATENCY rather than multi-stream THROUGHPUT.
+        # Several cameras batched into one process keep a request per camera in
+        # flight, which is what THROUGHPUT's multi-stream scheduling is for.
+        if num_requests == 1:
+            config = {'PERFORMANCE_HINT': 'LATENCY'}
+        else:
+            config = {'PERFORMANCE_HINT': 'THROUGHPUT', 'NUM_STREAMS': 'AUTO'}
+        self.compiled = core.compile_model(str(next(model_dir.glob('*.xml'))), 'CPU', config)
+        self.requests = [self.compiled.create_infer_request() for _ in range(num_requests)]
+        _, _, self.input_height, self.input_width = self.compiled.input(0).shape
+        # NCHW float32 input per request, filled in place every frame
+        self.input_tensors = [np.empty((1, 3, self.input_height, self.input_width), dtype=np.float32)
+                              for _ in range(num_requests)]
+        self.names = self._load_names(model_dir)
+        self.conf = conf
+        # The first requests allocate their buffers; do it before the camera starts
+        self.detect_batch([np.zeros((self.input_height, self.input_width, 3), dtype=np.uint8)] * num_requests)
+
+    @staticmethod
+    def _load_names(model_dir: Path) -> Dict[int, str]:
+        try:
+            import yaml
+            with open(model_dir / 'metadata.yaml') as f:
+                return {int(k): v for k, v in yaml.safe_load(f)['names'].items()}
+        except Exception:
+            return {}
+
+    def detect(self, img: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (N,4) xyxy boxes in model-input pixels and their (N,) class ids."""
+        self._fill(0, img)
+        self.requests[0].infer({0: self.input_tensors[0]})
+        return self._decode(self.requests[0])
+
+    def detect_batch(self, imgs):
+        """detect() for one image per request, with all requests in flight at once."""
+        for i, img in enumerate(imgs):
+            self._fill(i, img)
+            self.requests[i].start_async({0: self.input_tensors[i]})
+        for request in self.requests[:len(imgs)]:
+            request.wait()
+        return [self._decode(request) for request in self.requests[:len(imgs)]]
+
+    def _fill(self, i: int, img: np.ndarray) -> None:
+        if img.shape[:2] != (self.input_height, self.input_width):
+            img = cv2.resize(img, (self.input_width, self.input_height))
+        # BGR HWC uint8 -> RGB CHW float in [0, 1]
+        np.multiply(img[:, :, ::-1].transpose(2, 0, 1), 1.0 / 255.0, out=self.input_tensors[i][0])
+
+    def _decode(self, request) -> Tuple[np.ndarray, np.ndarray]:
+        # YOLOv8 head: (1, 4 + num_classes, anchors) with cx, cy, w, h rows first
+        pred = request.get_output_tensor(0).data[0].T
+        scores = pred[:, 4:]
+        cls_ids = scores.argmax(axis=1)
+        conf = scores[np.arange(len(cls_ids)), cls_ids]
+        keep = conf >= self.conf
+        if not keep.any():
+            return np.empty((0, 4), np.float32), np.empty(0, np.int32)
+        boxes, conf, cls_ids = pred[keep, :4], conf[keep], cls_ids[keep]
+
+        xywh = boxes  # already a copy from the boolean index
+        xywh[:, :2] -= xywh[:, 2:] / 2
+        idx = np.asarray(cv2.dnn.NMSBoxes(xywh, conf, self.conf, NMS_IOU), dtype=np.intp).reshape(-1)
+        xyxy = xywh[idx]
+        xyxy[:, 2:] += xyxy[:, :2]
+        return xyxy, cls_ids[idx].astype(np.int32)
+
+
+class HailoDetector:
+    """Runs a compiled YOLO HEF (NMS on-chip) on a Hailo-8/8L accelerator."""
+
+    def __init__(self, hef_path: str, conf: float, names: Dict[int, str]):
+        self.hef = HEF(hef_path)
+        self.device = VDevice()
+        configure_params = ConfigureParams.create_from_hef(self.hef, interface=HailoStreamInterface.PCIe)
+        self.network_group = self.device.configure(self.hef, configure_params)[0]
+
+        input_info = self.hef.get_input_vstream_infos()[0]
+        self.input_name = input_info.name
+        self.input_height, self.input_width = input_info.shape[:2]
+        # RGB input buffer reused every frame
+        self.input_buffer = np.empty((1, self.input_height, self.input_width, 3), dtype=np.uint8)
+        self.names = names
+        self.conf = conf
+
+        input_params = InputVStreamParams.make(self.network_group, format_type=FormatType.UINT8)
+        output_params = OutputVStreamParams.make(self.network_group, format_type=FormatType.FLOAT32)
+        self._activation = self.network_group.activate(self.network_group.create_params())
+        self._activation.__enter__()
+        # Streams stay open for the life of the detector rather than per frame
+        self._pipeline = InferVStreams(self.network_group, input_params, output_params)
+        self._pipeline.__enter__()
+
+    def detect(self, img: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (N,4) xyxy boxes in model-input pixels and their (N,) class ids."""
+        if img.shape[:2] != (self.input_height, self.input_width):
+            img = cv2.resize(img, (self.input_width, self.input_height))
+        cv2.cvtColor(img, cv2.COLOR_BGR2RGB, dst=self.input_buffer[0])
+        outputs = self._pipeline.infer({self.input_name: self.input_buffer})
+
+        # On-chip NMS output: per class, rows of normalized (ymin, xmin, ymax, xmax, score)
+        per_class = next(iter(outputs.values()))[0]
+        boxes, cls_ids = [], []
+        for class_id, detections in enumerate(per_class):
+            detections = np.asarray(detections, dtype=np.float32).reshape(-1, 5)
+            detections = detections[detections[:, 4] >= self.conf]
+            boxes.append(detections[:, [1, 0, 3, 2]])
+            cls_ids.append(np.full(len(detections), class_id, dtype=np.int32))
+        if not boxes:
+            return np.empty((0, 4), np.float32), np.empty(0, np.int32)
+        xyxy = np.concatenate(boxes)
+        xyxy *= np.array([self.input_width, self.input_height] * 2, dtype=np.float32)
+        return xyxy, np.concatenate(cls_ids)
+
+    def close(self) -> None:
+        self._pipeline.__exit__(None, None, None)
+        self._activation.__exit__(None, None, None)
+        self.device.release()
+
+
+class UltralyticsDetector:
+    """Keeps one warmed-up Ultralytics predictor and calls its stages directly."""
+
+    def __init__(self, model: YOLO, imgsz: Tuple[int, int], conf: float, threads: int = 0):
+        import torch
+        self.torch = torch
+        # Inference only: no autograd bookkeeping anywhere in the process. A
+        # capped intra-op pool leaves cores for OpenCV/capture and avoids
+        # oversubscription; a single inter-op thread suits one frame at a time.
+        torch.set_grad_enabled(False)
+        torch.backends.mkldnn.enabled = True
+        if threads > 0:
+            torch.set_num_threads(threads)
+            try:
+                torch.set_num_interop_threads(1)
+            except RuntimeError:
+                pass  # already fixed once inter-op work has run in this process
+        # Device and precision are fixed here so the predictor never re-probes them
+        device = 'cuda:0' if torch.cuda.is_available() else 'cpu'
+        # One predict() builds model.predictor (backend, args, warmup); later
+        # frames skip predict()'s per-call setup and source/stream wrappers
+        model.predict(np.zeros((*imgsz, 3), dtype=np.uint8), imgsz=imgsz, conf=conf, device=device,
+                      half=device != 'cpu', verbose=False)
+        self.predictor = model.predictor
+        self.names = model.names
+        self.input_height, self.input_width = imgsz
+        # Frames arrive at exactly imgsz (a stride multiple), so letterboxing is a
+        # no-op and the frame is copied straight into a persistent NCHW tensor
+        dtype = torch.float16 if getattr(self.predictor.model, 'fp16', False) else torch.float32
+        self.input_tensor = torch.empty((1, 3, *imgsz), dtype=dtype, device=self.predictor.device)
+
+    def detect(self, img: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (N,4) xyxy boxes in model-input pixels and their (N,) class ids."""
+        torch = self.torch
+        predictor = self.predictor
+        with torch.inference_mode():
+            # BGR HWC uint8 -> RGB CHW, converted and scaled in the persistent tensor
+            self.input_tensor[0].copy_(torch.from_numpy(img).permute(2, 0, 1).flip(0))
+            self.input_tensor.mul_(1.0 / 255.0)
+            preds = predictor.inference(self.input_tensor)
+            boxes = predictor.postprocess(preds, self.input_tensor, [img])[0].boxes
+        return boxes.xyxy.cpu().numpy(), boxes.cls.cpu().numpy()
 
 
 def make_roi_polygon(w: int, h: int) -> np.ndarray:
@@ -58,29 +318,65 @@ def make_roi_polygon(w: int, h: int) -> np.ndarray:
     return pts.reshape((-1, 1, 2))
 
 
-def in_roi(bbox: Tuple[int, int, int, int], roi_mask: np.ndarray) -> bool:
-    x1, y1, x2, y2 = bbox
-    cx, cy = (x1 + x2) // 2, y2
-    return roi_mask[cy, cx] > 0
-
-
-def estimate_distance_m(bbox: Tuple[int, int, int, int], cls_id: int, frame_center: Tuple[int, int]) -> float:
-    x1, y1, x2, y2 = bbox
-    h_img = max(1, y2 - y1)
-    h_real = REF_HEIGHTS_M.get(cls_id, 1.55)
+def make_roi_bounds(roi_poly: np.ndarray, h: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Per-row [x_left, x_right] extent of the ROI trapezoid.
+
+    Rows above the top edge get an empty range (x_left > x_right), so the
+    ROI test needs no separate y check.
+    """
+    (tl, tr, br, bl) = roi_poly.reshape(4, 2).astype(np.float64)
+    ys = np.arange(h, dtype=np.float64)
+    t = np.clip((ys - tl[1]) / max(1.0, bl[1] - tl[1]), 0.0, 1.0)
+    x_left = np.rint(tl[0] + t * (bl[0] - tl[0])).astype(np.int32)
+    x_right = np.rint(tr[0] + t * (br[0] - tr[0])).astype(np.int32)
+    above = ys < tl[1]
+    x_left[above] = 1
+    x_right[above] = 0
+    return x_left, x_right
+
+
+def roi_pixels(x_left: np.ndarray, x_right: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Row and column indices of every ROI pixel, expanded from the row bounds."""
+    counts = np.maximum(0, x_right - x_left + 1)
+    ys = np.repeat(np.arange(len(counts)), counts)
+    # offset of each pixel within its row, added to that row's x_left
+    starts = np.repeat(np.cumsum(counts) - counts, counts)
+    xs = np.arange(counts.sum()) - starts + np.repeat(x_left, counts)
+    return ys, xs
+
+
+def in_roi(xyxy: np.ndarray, x_left: np.ndarray, x_right: np.ndarray) -> np.ndarray:
+    """Boolean (N,) mask of boxes whose bottom-center point lies in the ROI."""
+    cx = (xyxy[:, 0] + xyxy[:, 2]) // 2
+    y2 = xyxy[:, 3]
+    return (cx >= x_left[y2]) & (cx <= x_right[y2])
+
+
+def estimate_distance_m(xyxy: np.ndarray, cls_ids: np.ndarray, frame_center: Tuple[int, int]) -> np.ndarray:
+    """Distances in meters for (N,4) boxes of the given classes."""
+    x1, y1, x2, y2 = xyxy.T
+    h_img = np.maximum(1, y2 - y1).astype(np.float32)
     # pinhole: d ≈ f * h_real / h_img
-    d = (FOCAL_LENGTH_PX * h_real) / float(h_img)
-    # perspective correction for off-axis
-    cx, cy = (x1 + x2) / 2.0, (y1 + y2) / 2.0
-    dx = (cx - frame_center[0])
-    d *= (1.0 + PERSPECTIVE_ALPHA * abs(dx))
-    return float(max(0.1, d))
-
-
-def draw_annotations(frame: np.ndarray, closest: Dict, roi_poly: np.ndarray) -> None:
-    overlay = frame.copy()
-    cv2.fillPoly(overlay, [roi_poly], (0, 255, 0))
-    frame[:] = cv2.addWeighted(overlay, 0.12, frame, 0.88, 0)
+    d = np.take(FH_LUT, cls_ids, mode='clip') / h_img
+    # perspective correction for off-axis: d *= 1 + alpha * |cx - center|
+    k = (x1 + x2).astype(np.float32)
+    k *= 0.5
+    k -= frame_center[0]
+    np.abs(k, out=k)
+    k *= PERSPECTIVE_ALPHA
+    k += 1.0
+    d *= k
+    return np.maximum(d, 0.1, out=d)
+
+
+def draw_annotations(frame: np.ndarray, closest: Dict, roi_px: Tuple[np.ndarray, np.ndarray]) -> None:
+    # Tint only the ROI pixels in place instead of blending a full-frame copy
+    px = frame[roi_px].astype(np.uint16)
+    px *= ROI_KEEP
+    px += ROI_TINT
+    px >>= 8
+    frame[roi_px] = px
     if not closest:
         return
     x1, y1, x2, y2 = closest['bbox']
@@ -91,6 +387,229 @@ def draw_annotations(frame: np.ndarray, closest: Dict, roi_poly: np.ndarray) ->
     cv2.putText(frame, label, (x1, max(20, y1 - 10)), cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2, cv2.LINE_AA)
 
 
+def open_capture(args, camera: int) -> cv2.VideoCapture:
+    if args.gst:
+        pipeline = args.gst
+        if pipeline in GST_PIPELINES:
+            pipeline = GST_PIPELINES[pipeline].format(camera=camera, width=args.width, height=args.height)
+        return cv2.VideoCapture(pipeline, cv2.CAP_GSTREAMER)
+    cap = cv2.VideoCapture(camera)
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, args.width)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, args.height)
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    return cap
+
+
+def uses_yolo_weights(backend: str) -> bool:
+    """True if the backend runs through Ultralytics and needs the weights loaded."""
+    return backend == 'ultralytics' or (backend == 'openvino' and ov is None)
+
+
+def make_detector(backend: str, model_path: str, model, hef_path: str = '', torch_threads: int = 0):
+    """Build the per-process detector; `model` is an already loaded YOLO or None."""
+    if backend == 'hailo':
+        try:
+            # Class names aren't stored in the HEF; COCO ids are assumed like the .pt model
+            return HailoDetector(hef_path, DETECTION_CONFIDENCE, VEHICLE_CLASS_NAMES)
+        except Exception as e:
+            print(f"Hailo backend unavailable, falling back to Ultralytics CPU: {e}")
+            model = None
+    if backend == 'openvino' and ov is not None:
+        try:
+            return OpenVINODetector(model_path, DETECTION_CONFIDENCE)
+        except Exception as e:
+            print(f"OpenVINO backend unavailable, falling back to Ultralytics CPU: {e}")
+            model = None
+    if model is None:
+        model = YOLO(model_path, task='detect')
+    return UltralyticsDetector(model, DETECTOR_IMGSZ, DETECTION_CONFIDENCE, torch_threads)
+
+
+def closest_vehicle(xyxy: np.ndarray, cls_ids: np.ndarray, names: Dict[int, str], box_scale: np.ndarray,
+                    box_max: np.ndarray, roi_bounds: Tuple[np.ndarray, np.ndarray],
+                    frame_center: Tuple[int, int]) -> Dict:
+    """Closest in-ROI vehicle among detector-pixel boxes, or {} if there is none."""
+    if len(cls_ids) == 0:
+        return {}
+    xyxy = (xyxy * box_scale).astype(np.int32)
+    cls_ids = cls_ids.astype(np.int32)
+    np.clip(xyxy, 0, box_max, out=xyxy)
+    keep = np.isin(cls_ids, VEHICLE_CLASS_ARRAY)
+    keep &= (xyxy[:, 2] > xyxy[:, 0]) & (xyxy[:, 3] > xyxy[:, 1])
+    keep &= in_roi(xyxy, *roi_bounds)
+    # One masked reduction picks the closest valid box; rejected
+    # boxes are pushed to +inf instead of being gathered out
+    dists = np.where(keep, estimate_distance_m(xyxy, cls_ids, frame_center), np.inf)
+    i = int(np.argmin(dists))
+    if not keep[i]:
+        return {}
+    cls_id = int(cls_ids[i])
+    return {'bbox': tuple(int(v) for v in xyxy[i]), 'distance_m': float(dists[i]),
+            'name': names.get(cls_id, f"cls{cls_id}")}
+
+
+def camera_loop(args, camera: int, backend: str, model_path: str, model, tag: str = '') -> None:
+    """Capture, detect and annotate frames from one camera until 'q' or Ctrl+C."""
+    use_display = args.display
+
+    cap = open_capture(args, camera)
+    if not cap.isOpened():
+        print(f"Failed to open camera{tag}")
+        return
+
+    # Build ROI for the requested frame size
+    roi_poly = make_roi_polygon(args.width, args.height)
+    roi_x_left, roi_x_right = make_roi_bounds(roi_poly, args.height)
+    np.clip(roi_x_right, None, args.width - 1, out=roi_x_right)
+    roi_px = roi_pixels(roi_x_left, roi_x_right)
+    cx = args.width // 2
+    cy = args.height // 2
+    box_max = np.array([args.width - 1, args.height - 1] * 2, dtype=np.int32)
+
+    detector = make_detector(backend, model_path, model, args.hef, args.torch_threads)
+    det_h, det_w = detector.input_height, detector.input_width
+
+    # Downscaled detector input, resized into the same buffer every frame
+    small = np.empty((det_h, det_w, 3), dtype=np.uint8)
+    box_scale = np.array([args.width / det_w, args.height / det_h] * 2, dtype=np.float32)
+
+    # Motion gate state
+    thumb_w, thumb_h = MOTION_THUMB_SIZE
+    thumb_bgr = np.empty((thumb_h, thumb_w, 3), dtype=np.uint8)
+    thumb = np.empty((thumb_h, thumb_w), dtype=np.uint8)
+    ref_thumb = np.empty_like(thumb)
+    sad_threshold = MOTION_SAD_PER_PX * thumb.size
+    last_infer = None
+    closest: Dict = {}
+
+    # Capture runs on its own thread so the next frame is grabbed and decoded
+    # while the detector works on the current one
+    frames: Queue = Queue(maxsize=1)
+    stop = threading.Event()
+    producer = threading.Thread(target=capture_frames, args=(cap, frames, stop), daemon=True)
+    producer.start()
+
+    try:
+        while True:
+            try:
+                frame = frames.get(timeout=1.0)
+            except Empty:
+                continue
+
+            cv2.resize(frame, (det_w, det_h), dst=small, interpolation=cv2.INTER_AREA)
+
+            reuse = False
+            if MOTION_GATE:
+                cv2.resize(small, MOTION_THUMB_SIZE, dst=thumb_bgr, interpolation=cv2.INTER_AREA)
+                cv2.cvtColor(thumb_bgr, cv2.COLOR_BGR2GRAY, dst=thumb)
+                now = time.perf_counter()
+                # Scene barely changed since the last inference: keep its result
+                reuse = (last_infer is not None and now - last_infer < MOTION_MAX_REUSE_S
+                         and cv2.norm(thumb, ref_thumb, cv2.NORM_L1) < sad_threshold)
+                if not reuse:
+                    last_infer = now
+                    ref_thumb[:] = thumb
+
+            if not reuse:
+                # All detections at once: (N,4) boxes and (N,) class ids
+                xyxy, cls_ids = detector.detect(small)
+
+                closest = closest_vehicle(xyxy, cls_ids, detector.names, box_scale, box_max,
+                                          (roi_x_left, roi_x_right), (cx, cy))
+
+            draw_annotations(frame, closest, roi_px)
+
+            if closest and not reuse:
+                print(f"Closest front vehicle{tag}: {closest['name']} ~ {closest['distance_m']:.1f} m")
+
+            if use_display:
+                cv2.imshow(f'Front Distance{tag}', frame)
+                if cv2.waitKey(1) & 0xFF == ord('q'):
+                    break
+
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        producer.join(timeout=2.0)
+        cap.release()
+        if isinstance(detector, HailoDetector):
+            detector.close()
+        if use_display:
+            cv2.destroyAllWindows()
+
+
+def batched_camera_loop(args, cameras, model_path: str) -> None:
+    """
+    Run every camera in this process with one OpenVINO request per camera.
+
+    Each round takes the newest frame from every camera and keeps all of
+    their inference requests in flight together on a THROUGHPUT-compiled
+    model, then annotates each frame. The motion gate is not used here.
+    """
+    use_display = args.display
+    caps = [open_capture(args, cam) for cam in cameras]
+    if not all(cap.isOpened() for cap in caps):
+        print("Failed to open camera")
+        for cap in caps:
+            cap.release()
+        return
+
+    # Every camera shares the frame size, so the ROI geometry is built once
+    roi_poly = make_roi_polygon(args.width, args.height)
+    roi_x_left, roi_x_right = make_roi_bounds(roi_poly, args.height)
+    np.clip(roi_x_right, None, args.width - 1, out=roi_x_right)
+    roi_px = roi_pixels(roi_x_left, roi_x_right)
+    center = (args.width // 2, args.height // 2)
+    box_max = np.array([args.width - 1, args.height - 1] * 2, dtype=np.int32)
+
+    detector = OpenVINODetector(model_path, DETECTION_CONFIDENCE, num_requests=len(cameras))
+    det_h, det_w = detector.input_height, detector.input_width
+    smalls = [np.empty((det_h, det_w, 3), dtype=np.uint8) for _ in cameras]
+    box_scale = np.array([args.width / det_w, args.height / det_h] * 2, dtype=np.float32)
+
+    stop = threading.Event()
+    queues = [Queue(maxsize=1) for _ in cameras]
+    producers = [threading.Thread(target=capture_frames, args=(cap, q, stop), daemon=True)
+                 for cap, q in zip(caps, queues)]
+    for producer in producers:
+        producer.start()
+
+    try:
+        while True:
+            try:
+                frames = [q.get(timeout=1.0) for q in queues]
+            except Empty:
+                continue
+
+            for frame, small in zip(frames, smalls):
+                cv2.resize(frame, (det_w, det_h), dst=small, interpolation=cv2.INTER_AREA)
+            detections = detector.detect_batch(smalls)
+
+            for cam, frame, (xyxy, cls_ids) in zip(cameras, frames, detections):
+                closest = closest_vehicle(xyxy, cls_ids, detector.names, box_scale, box_max,
+                                          (roi_x_left, roi_x_right), center)
+                draw_annotations(frame, closest, roi_px)
+                if closest:
+                    print(f"Closest front vehicle [cam {cam}]: {closest['name']} ~ {closest['distance_m']:.1f} m")
+                if use_display:
+                    cv2.imshow(f'Front Distance [cam {cam}]', frame)
+
+            if use_display and cv2.waitKey(1) & 0xFF == ord('q'):
+                break
+
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        for producer in producers:
+            producer.join(timeout=2.0)
+        for cap in caps:
+            cap.release()
+        if use_display:
+            cv2.destroyAllWindows()
+
+
 def run():
     import argparse
     parser = argparse.ArgumentParser(description='Front vehicle distance (YOLO)')
@@ -98,106 +617,105 @@ def run():
                         help='Inference backend')
     parser.add_argument('--model', default=YOLO_MODEL, help='YOLO model or exported model path')
     parser.add_argument('--camera', type=int, default=CAMERA_INDEX, help='OpenCV camera index')
+    parser.add_argument('--cameras', type=int, nargs='+', default=None,
+                        help='Several camera indices, one process each sharing the loaded model')
+    parser.add_argument('--batch-cameras', action='store_true',
+                        help='With --cameras and the openvino backend: run all cameras in one process, '
+                             'inferring their frames together on a THROUGHPUT-compiled model')
+    parser.add_argument('--gst', default='',
+                        help=f'GStreamer capture: a preset ({", ".join(GST_PIPELINES)}) with hardware MJPEG '
+                             'decode for /dev/video<camera>, or a full pipeline string')
     parser.add_argument('--width', type=int, default=FRAME_WIDTH)
     parser.add_argument('--height', type=int, default=FRAME_HEIGHT)
     parser.add_argument('--display', action='store_true', default=DISPLAY)
     parser.add_argument('--hef', default='', help='Hailo HEF path (if using hailo backend)')
+    parser.add_argument('--int8', action='store_true',
+                        help='OpenVINO backend: export INT8 (NNCF) instead of FP16 on VNNI-capable CPUs')
+    parser.add_argument('--calib-data', default='data.yaml', help='Dataset YAML for INT8 calibration')
+    parser.add_argument('--torch-threads', type=int, default=0,
+                        help='PyTorch intra-op threads per camera process (0: half the cores, split across cameras)')
     args = parser.parse_args()
 
     backend = args.backend
     model_path = args.model
-    use_display = args.display
-
-    cap = cv2.VideoCapture(CAMERA_INDEX)
-    cap.set(cv2.CAP_PROP_FRAME_WIDTH, args.width)
-    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, args.height)
-    if not cap.isOpened():
-        print("Failed to open camera")
-        return
-
-    # Build ROI for the requested frame size
-    roi_poly = make_roi_polygon(args.width, args.height)
-    roi_mask = np.zeros((args.height, args.width), dtype=np.uint8)
-    cv2.fillPoly(roi_mask, [roi_poly], 255)
-    cx = args.width // 2
-    cy = args.height // 2
 
     # Select backend
-    ov_model = None
     if backend == 'openvino':
         try:
             # Export once if plain .pt provided
             if model_path.endswith('.pt'):
+                # INT8 only pays off with VNNI; other CPUs are faster on FP16
+                int8 = args.int8 and cpu_has_vnni()
+                if args.int8 and not int8:
+                    print("CPU lacks AVX-512/AVX VNNI; exporting FP16 instead of INT8")
                 base = Path(model_path).stem
-                out_dir = Path('models')
-                out_dir.mkdir(exist_ok=True)
-                exported = out_dir / f'{base}_openvino_model'
-                if not (exported.with_suffix('.xml')).exists():
-                    YOLO(model_path).export(format='openvino', dynamic=False, half=True, imgsz=(args.height, args.width), opset=13, optimize=True)
+                suffix = '_int8_openvino_model' if int8 else '_openvino_model'
+                exported = Path(model_path).with_name(f'{base}{suffix}')
+                if not exported.is_dir():
+                    export_args = dict(format='openvino', dynamic=False, imgsz=DETECTOR_IMGSZ)
+                    if int8:
+                        # NNCF post-training quantization calibrated on --calib-data
+                        export_args.update(int8=True, data=args.calib_data)
+                    else:
+                        export_args.update(half=True, opset=13, optimize=True)
+                    YOLO(model_path).export(**export_args)
                 model_path = str(exported)
-            ov_model = YOLO(model_path)
         except Exception as e:
             print(f"OpenVINO backend unavailable, falling back to Ultralytics CPU: {e}")
             backend = 'ultralytics'
+            model_path = args.model
 
     if backend == 'hailo':
-        if hailo is None or not args.hef:
+        if not HAILO_AVAILABLE or not args.hef:
             print("Hailo SDK/HEF not found. Falling back to Ultralytics CPU. Provide --hef and install Hailo SDK.")
             backend = 'ultralytics'
 
-    if backend == 'ultralytics':
-        model = YOLO(model_path)
-    elif backend == 'openvino':
-        model = ov_model
-    else:
-        model = YOLO(model_path)  # safety fallback
+    # A full pipeline string names one device; presets are filled in per camera
+    per_camera = not args.gst or args.gst in GST_PIPELINES
+    cameras = args.cameras if args.cameras and per_camera else [args.camera]
+    if args.torch_threads <= 0:
+        # Keep threads x camera processes within half the cores
+        args.torch_threads = max(1, (os.cpu_count() or 1) // 2 // len(cameras))
+    if len(cameras) == 1:
+        model = YOLO(model_path, task='detect') if uses_yolo_weights(backend) else None
+        camera_loop(args, cameras[0], backend, model_path, model)
+        return
 
+    if args.batch_cameras:
+        if backend == 'openvino' and ov is not None:
+            batched_camera_loop(args, cameras, model_path)
+            return
+        print("--batch-cameras needs the openvino backend with OpenVINO installed; using one process per camera")
+
+    import multiprocessing as mp
+    if 'fork' in mp.get_all_start_methods():
+        # Load (and fuse) the weights once here; forked children share these
+        # pages copy-on-write since inference only reads them. Fusing up front
+        # keeps the predictor from rewriting the weights in every child.
+        ctx = mp.get_context('fork')
+        model = None
+        if uses_yolo_weights(backend):
+            model = YOLO(model_path, task='detect')
+            if model_path.endswith('.pt'):
+                model.fuse()
+    else:
+        # No fork (Windows): each spawned child loads its own copy
+        ctx = mp.get_context('spawn')
+        model = None
+
+    procs = [ctx.Process(target=camera_loop, args=(args, cam, backend, model_path, model, f' [cam {cam}]'))
+             for cam in cameras]
+    for p in procs:
+        p.start()
     try:
-        while True:
-            ok, frame = cap.read()
-            if not ok:
-                time.sleep(0.02)
-                continue
-
-            results = model.predict(source=frame, conf=DETECTION_CONFIDENCE, verbose=False)[0]
-            boxes = results.boxes
-
-            candidates: List[Dict] = []
-            if boxes is not None and len(boxes) > 0:
-                for b in boxes:
-                    cls_id = int(b.cls)
-                    if cls_id not in VEHICLE_CLASS_IDS:
-                        continue
-                    x1, y1, x2, y2 = map(int, b.xyxy[0].tolist())
-                    if x1 < 0 or y1 < 0 or x2 >= FRAME_WIDTH or y2 >= FRAME_HEIGHT:
-                        x1 = max(0, x1); y1 = max(0, y1)
-                        x2 = min(FRAME_WIDTH - 1, x2); y2 = min(FRAME_HEIGHT - 1, y2)
-                    if x2 <= x1 or y2 <= y1:
-                        continue
-                    if not in_roi((x1, y1, x2, y2), roi_mask):
-                        continue
-                    dist_m = estimate_distance_m((x1, y1, x2, y2), cls_id, (cx, cy))
-                    name = results.names.get(cls_id, f"cls{cls_id}")
-                    candidates.append({'bbox': (x1, y1, x2, y2), 'distance_m': dist_m, 'name': name})
-
-            closest = min(candidates, key=lambda d: d['distance_m']) if candidates else {}
-            draw_annotations(frame, closest, roi_poly)
-
-            if closest:
-                print(f"Closest front vehicle: {closest['name']} ~ {closest['distance_m']:.1f} m")
-
-            if use_display:
-                cv2.imshow('Front Distance', frame)
-                if cv2.waitKey(1) & 0xFF == ord('q'):
-                    break
-
-    finally:
-        cap.release()
-        if use_display:
-            cv2.destroyAllWindows()
+        for p in procs:
+            p.join()
+    except KeyboardInterrupt:
+        for p in procs:
+            p.join(timeout=3.0)
+            if p.is_alive():
+                p.terminate()
 
 
 if __name__ == '__main__':
     run()
-
-
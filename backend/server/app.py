@@ -10,18 +10,75 @@ Endpoints:
 - POST /emit - Receives events from backend modules
 - GET /events - SSE stream for frontend clients
 - GET /health - Health check endpoint
+
+Modules on the same host can also send JSON events as datagrams to the Unix
+socket at EVENT_SOCKET_PATH, which avoids the TCP and HTTP overhead of /emit.
 """
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from sse_starlette.sse import EventSourceResponse
 import asyncio
-import json
+import os
+import orjson
+import socket
+import sys
+from contextlib import asynccontextmanager
 from collections import deque
 from datetime import datetime
 from typing import Dict, Any
 
-app = FastAPI(title="Driver Assist Event Server")
+# Unix datagram socket for events from modules on the same host
+EVENT_SOCKET_PATH = "/tmp/driver_assist_events.sock"
+
+# Per-event console log; off by default since a line per event stalls the loop
+LOG_EVENTS = os.environ.get("DRIVER_ASSIST_LOG_EVENTS") == "1"
+
+
+def read_socket_events(sock):
+    """Drain all datagrams waiting on the local event socket."""
+    while True:
+        try:
+            data = sock.recv(65536)
+        except BlockingIOError:
+            return
+        try:
+            event = orjson.loads(data)
+        except orjson.JSONDecodeError:
+            continue
+        if isinstance(event, dict):
+            record_event(event)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    """Listen on the local event socket while the server is running."""
+    loop = asyncio.get_running_loop()
+    sock = None
+    try:
+        if os.path.exists(EVENT_SOCKET_PATH):
+            os.unlink(EVENT_SOCKET_PATH)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        sock.bind(EVENT_SOCKET_PATH)
+        sock.setblocking(False)
+        loop.add_reader(sock.fileno(), read_socket_events, sock)
+        print(f"Local event socket: {EVENT_SOCKET_PATH}")
+    except (AttributeError, OSError, NotImplementedError) as e:
+        # Unix datagram sockets are unavailable (e.g. Windows); HTTP still works
+        print(f"Local event socket disabled: {e}")
+        if sock is not None:
+            sock.close()
+        sock = None
+
+    yield
+
+    if sock is not None:
+        loop.remove_reader(sock.fileno())
+        sock.close()
+        os.unlink(EVENT_SOCKET_PATH)
+
+
+app = FastAPI(title="Driver Assist Event Server", lifespan=lifespan)
 
 # Enable CORS for React frontend
 app.add_middleware(
@@ -32,10 +89,43 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# In-memory event queue (max 100 events to prevent memory issues)
+# In-memory event queue (max 100 events to prevent memory issues); events are
+# stored already serialized since they don't change after being recorded
 event_queue = deque(maxlen=100)
 event_counter = 0
 
+# One queue per connected SSE client; record_event pushes to each of them
+subscribers = set()
+SUBSCRIBER_QUEUE_SIZE = 256
+
+
+def record_event(event: Dict[Any, Any]) -> int:
+    """Stamp an incoming event and add it to the queue. Returns its counter value."""
+    global event_counter
+    now = datetime.now()
+
+    # Add timestamp and unique ID if not present
+    event.setdefault('timestamp', now.isoformat())
+    event_counter += 1
+    event.setdefault('id', event_counter)
+
+    # Serialize once here rather than once per connected client
+    payload = orjson.dumps(event).decode()
+    event_queue.append(payload)
+
+    # Wake connected clients, dropping a slow client's oldest event if it is full
+    for q in subscribers:
+        if q.full():
+            q.get_nowait()
+        q.put_nowait(payload)
+
+    if LOG_EVENTS:
+        sys.stdout.write(f"[{now:%H:%M:%S}] Event received: {event.get('module', 'Unknown')} - "
+                         f"{event.get('message', 'No message')}\n")
+
+    return event_counter
+
+
 @app.post("/emit")
 async def emit_event(event: Dict[Any, Any]):
     """
@@ -50,48 +140,32 @@ async def emit_event(event: Dict[Any, Any]):
         ... (module-specific fields)
     }
     """
-    global event_counter
-
-    # Add timestamp if not present
-    if 'timestamp' not in event:
-        event['timestamp'] = datetime.now().isoformat()
-
-    # Add unique ID
-    event_counter += 1
-    if 'id' not in event:
-        event['id'] = event_counter
+    event_id = record_event(event)
 
-    # Add to queue
-    event_queue.append(event)
-
-    print(f"[{datetime.now().strftime('%H:%M:%S')}] Event received: {event.get('module', 'Unknown')} - {event.get('message', 'No message')}")
-
-    return {"status": "ok", "event_id": event_counter}
+    return {"status": "ok", "event_id": event_id}
 
 
 @app.get("/events")
 async def stream_events():
     """
     SSE endpoint that streams events to frontend clients.
-    Checks for new events every 50ms.
+    Events are pushed to each client as they are recorded.
     """
     async def event_generator():
-        # Track which events this client has received
-        last_seen_id = 0
-
-        while True:
-            # Send any new events
-            new_events = [e for e in event_queue if e.get('id', 0) > last_seen_id]
-
-            for event in new_events:
+        # Start with the recent history, then wait for new events
+        q = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        for payload in event_queue:
+            q.put_nowait(payload)
+        subscribers.add(q)
+        try:
+            while True:
+                payload = await q.get()
                 yield {
                     "event": "message",
-                    "data": json.dumps(event)
+                    "data": payload
                 }
-                last_seen_id = event.get('id', 0)
-
-            # Check for new events every 50ms (20Hz)
-            await asyncio.sleep(0.05)
+        finally:
+            subscribers.discard(q)
 
     return EventSourceResponse(event_generator())
 
@@ -127,4 +201,5 @@ if __name__ == "__main__":
     print("Starting Driver Assist Event Server on http://0.0.0.0:8000")
     print("SSE endpoint: http://0.0.0.0:8000/events")
     print("Health check: http://0.0.0.0:8000/health")
+    print("Set DRIVER_ASSIST_LOG_EVENTS=1 to log every received event")
     uvicorn.run(app, host="0.0.0.0", port=8000)